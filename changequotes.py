@@ -1,55 +1,71 @@
-import datetime
 import json
-from collections import OrderedDict
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "dataprep"))
 
-def insert_quote(date_str, quote_obj):
-    quotes_path = Path("public/quotes.json")
+from columnar import dumps as columnar_dumps
+from permutation import SPEC_FILE, PermutationSchedule
+from publish import write_published, write_shards
+from schedule import Schedule
+from validate import validate_schedule
 
-    with quotes_path.open("r", encoding="utf-8") as f:
-        quotes = json.load(f)
 
-    quotes_to_bump = {dt:q for dt, q in quotes.items() if dt >= date_str}
-    _new_quotes = {}
-    for dt, quote in quotes_to_bump.items():
-        new_date = datetime.datetime.strptime(dt, "%Y-%m-%d") + datetime.timedelta(days=1)
-        new_date_str = new_date.strftime("%Y-%m-%d")
-        _new_quotes[new_date_str] = quote
+QUOTES_PATH = Path("public/quotes.json")
+PERMUTATION_PATH = SPEC_FILE
 
-    _new_quotes[date_str] = quote_obj
 
-    quotes.update(_new_quotes)
-    return quotes
+def load_schedule():
+    return Schedule.load(QUOTES_PATH)
+
+
+def insert_quote(date_str, quote_obj):
+    schedule = load_schedule()
+    schedule.apply(inserts=[(date_str, quote_obj)])
+    return schedule.to_dict()
 
 def remove_quote(date_str):
-    quotes_path = Path("public/quotes.json")
-    with quotes_path.open("r", encoding="utf-8") as f:
-        quotes = json.load(f)
-    
-    if date_str not in quotes:
+    schedule = load_schedule()
+
+    if date_str not in schedule:
         print(f"No quote found for date: {date_str}")
-        return quotes
-    
-    del quotes[date_str]
-    
-    quotes_to_shift = {dt: q for dt, q in quotes.items() if dt > date_str}
-    
-    for dt in quotes_to_shift.keys():
-        del quotes[dt]
-    
-    for dt, quote in quotes_to_shift.items():
-        old_date = datetime.datetime.strptime(dt, "%Y-%m-%d")
-        new_date = old_date - datetime.timedelta(days=1)
-        new_date_str = new_date.strftime("%Y-%m-%d")
-        quotes[new_date_str] = quote
-    
+        return schedule.to_dict()
+
+    schedule.apply(removes=[date_str])
+    return schedule.to_dict()
+
+def apply_changes(inserts=(), removes=(), swaps=(), reservations=()):
+    """Loads the schedule once, applies a whole batch of edits in one pass and saves once.
+
+    All dates refer to the schedule as it is before the batch, see Schedule.apply.
+    """
+    schedule = load_schedule()
+    schedule.apply(inserts, removes, swaps, reservations)
+    quotes = schedule.to_dict()
+    save_quotes(quotes)
     return quotes
 
-def save_quotes(quotes):
-    quotes_path = Path("public/quotes.json")
-    with quotes_path.open("w", encoding="utf-8") as f:
+def apply_permutation_changes(inserts=(), removes=(), swaps=(), reservations=()):
+    """Same batch as apply_changes, recorded in the override table of the published permutation."""
+    permutation = PermutationSchedule.load(PERMUTATION_PATH)
+    permutation.record(inserts, removes, swaps, reservations)
+    # Every edited day and the one after it, enough to catch a broken override
+    touched = sorted({d for d, _ in inserts} | set(removes) | {d for s in swaps for d in s} | set(reservations))
+    for date_str in touched:
+        validate_schedule(permutation.days(date_str, 2))
+    permutation.save(PERMUTATION_PATH)
+    return permutation
+
+def save_quotes(quotes, granularity="month", columnar=False):
+    # Refuse to publish a broken schedule, nothing is written if this raises
+    validate_schedule(quotes)
+    # quotes.json stays readable, it's the copy that gets edited and diffed. The client
+    # only loads the minified, precompressed shards
+    with QUOTES_PATH.open("w", encoding="utf-8") as f:
         json.dump(quotes, f, indent=4, ensure_ascii=False)
+    write_shards(quotes, "public/quotes", granularity)
+    if columnar:
+        write_published("public/quotes.columnar.json", columnar_dumps(quotes).encode("utf-8"))
 
 
 
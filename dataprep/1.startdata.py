@@ -1,16 +1,38 @@
-import csv
-import json
+from dedup import find_duplicates
+from search import update_index
+from sheets import quotes as todo_rows
+from store import open_json, save_json, selected_ids
 
-def lowercase_keys(d):
-    return {k.lower(): v for k, v in d.items()}
+# quote_id -> hash of the quotestodo.tsv row each quote was last built from
+ROWS_FILE = "quotestodo_rows.json"
+
+# Quotes that are already filled in keep what the later stages (and hand fixes) put there,
+# only new rows, edited rows and the rows pipeline.py reports as changed start over from the TSV
+existing = open_json("quotedata.json", {})
+changed = selected_ids() or set()
+rows = todo_rows("quotestodo.tsv")
+built_from = open_json(ROWS_FILE, None)
+if built_from is None:
+    # Nothing recorded yet, so take quotedata.json as built from the rows as they are now
+    built_from = {row.quote_id: row.row_hash for row in rows}
 
 quotes = {}
-with open("quotestodo.tsv", "r", encoding="utf-8") as f:
-    reader = csv.DictReader(f, delimiter="\t")
-    for row in reader:
-        row = lowercase_keys(row)
-        quote_id = row.pop("quote_id")
-        quotes[quote_id] = row
+new_ids = set()
+for row in rows:
+    if row.quote_id in existing and row.quote_id not in changed and built_from.get(row.quote_id) == row.row_hash:
+        quotes[row.quote_id] = existing[row.quote_id]
+    else:
+        quotes[row.quote_id] = {"quote": row.quote, "title": row.title, "url": row.url, "year": row.year, "type": row.type}
+        new_ids.add(row.quote_id)
+
+# Every quote is scheduled ten times, so a duplicate wastes ten days, flag them for the curator
+for a, b, reason in find_duplicates(quotes, only=new_ids if existing else None):
+    print(f"Possible duplicate: quote {a} and {b}, {reason}")
+
+save_json("quotedata.json", quotes)
+save_json(ROWS_FILE, {row.quote_id: row.row_hash for row in rows})
 
-with open("quotedata.json", "w", encoding="utf-8") as f:
-    json.dump(quotes, f, indent=4, ensure_ascii=False)
+# Only new and changed quotes get retokenized, the rest of the search index is kept
+_, indexed, dropped = update_index(quotes)
+if indexed or dropped:
+    print(f"Search index: {indexed} quotes indexed, {dropped} dropped")
@@ -1,58 +1,49 @@
-import json
-import yt_dlp
+import argparse
 from urllib.parse import urlparse
 
+from channelindex import classify, load_table, merge_metadata, missing_ids
+from store import open_store, selected_ids
+from ytfetch import YtDlpExtractor, fetch_metadata, fixture_extractor, video_id
 
-def get_youtube_data(url):
-    ydl_opts = {
-        "quiet": True,
-    }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        try:
-            info = ydl.extract_info(url, download=False)
-            channel = info.get("channel")
-            title = info.get("title")
-            year = info.get("upload_date")[0:4]
-            return channel, title, year
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-            return None, None, None
+parser = argparse.ArgumentParser()
+parser.add_argument("--workers", type=int, default=8)
+parser.add_argument("--fixture", help="answer lookups from a fixture file instead of yt_dlp")
+parser.add_argument("--listing", action="append", default=[],
+                    help="flat channel listing (yt-dlp --flat-playlist -J) to classify from, can be repeated")
+args = parser.parse_args()
 
+make_extractor = fixture_extractor(args.fixture) if args.fixture else YtDlpExtractor
 
-# Read JSON file
-with open("quotedata.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
+store = open_store("quotedata.json", only=selected_ids())
+
+# Resolve every YouTube URL that still needs a type up front
+todo_urls = [entry.get("url", "") for _, entry in store.items(missing="type") if video_id(entry.get("url", ""))]
+# Videos found in a channel listing need no extraction, only the rest are looked up one by one
+listed = load_table(*args.listing) if args.listing else {}
+missing = set(missing_ids(todo_urls, listed))
+print(f"{len(todo_urls) - len(missing)} videos classified from listings, extracting {len(missing)}")
+# A failed extraction keeps what the listing had, a Joe video listed without a date is still a YouTube video
+fetched = fetch_metadata([u for u in todo_urls if video_id(u) in missing], make_extractor, workers=args.workers)
+metadata = merge_metadata(listed, fetched)
 
 # Process each entry
-for key, entry in data.items():
-    if entry.get("type", "") != "":
-        continue
+with store:
+    for key, entry in store.items(missing="type"):
+        url = entry.get("url", "")
+        parsed_url = urlparse(url)
+        print(f"Processing {url}")
+        if "reddit.com" in parsed_url.netloc:
+            store.update(key, year=None, type="Reddit", title="Reddit Post")
+        elif "youtube.com" in parsed_url.netloc or "youtu.be" in parsed_url.netloc:
+            meta = metadata.get(video_id(url))
+            if meta is None:
+                print(f"Failed to get data for {url}")
+                continue
+            if classify(meta) == "YouTube":
+                year = (meta["upload_date"] or "")[0:4] or None
+                store.update(key, title=meta["title"], type="YouTube", year=year)
+            else:
+                store.update(key, title=None, type="Stream", year=None)
 
-    url = entry.get("url", "")
-    parsed_url = urlparse(url)
-    print(f"Processing {url}")
-    if "reddit.com" in parsed_url.netloc:
-        entry["year"] = None
-        entry["type"] = "Reddit"
-        entry["title"] = "Reddit Post"
-    elif "youtube.com" in parsed_url.netloc or "youtu.be" in parsed_url.netloc:
-        channel, title, year = get_youtube_data(url)
-        if channel is None:
-            print(f"Failed to get data for {url}")
-            continue
-        if channel == "Joseph Anderson":
-            entry["title"] = title
-            entry["type"] = "YouTube"
-            entry["year"] = year
         else:
-            entry["title"] = None
-            entry["type"] = "Stream"
-            entry["year"] = None
-
-    else:
-        entry["title"] = None
-        entry["type"] = "Unknown"
-        entry["year"] = None
-
-    with open("quotedata.json", "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+            store.update(key, title=None, type="Unknown", year=None)
@@ -1,49 +1,42 @@
-import json
-import csv
-from pathlib import Path
-
-
-def open_json(file, default=None):
-    p = Path(file)
-    if not p.exists():
-        return default
-    else:
-        with open(file, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-
-def save_json(file, data):
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+from sheets import quotes as todo_rows
+from store import open_json, save_json, selected_ids
+from streamindex import StreamIndex
+from titlematch import learn, load_matcher
 
 
 quote_data = open_json("quotedata.json", {})
 
-todo_titles = {}
-with open("quotestodo.tsv", "r", encoding="utf-8") as f:
-    reader = csv.reader(f, delimiter="\t")
-    next(reader)  # Skip header
-    for row in reader:
-        quote_id, _, title = row[0], row[1], row[2]
-        todo_titles[quote_id] = title
+todo_titles = {row.quote_id: row.title for row in todo_rows("quotestodo.tsv")}
 
 
 title_map = open_json("title_map.json", {})
+stream_index = StreamIndex("streamdata.tsv", title_map)
+title_matcher = load_matcher(title_map)
+only = selected_ids()
 
 for quote_id, quote in quote_data.items():
+    if only is not None and quote_id not in only:
+        continue
     if quote["type"] == "Stream":
         todo_title = todo_titles.get(quote_id)
+        stream = stream_index.lookup(quote["url"])
+        match = title_matcher.match(todo_title) if todo_title else None
         if todo_title and todo_title in title_map:
             quote["title"] = title_map[todo_title]
+        elif stream is not None:
+            quote["title"] = stream.game
+        elif match is not None:
+            print(f"{todo_title} -> {match}")
+            quote["title"] = match
+            learn(title_map, todo_title, match, title_matcher)
         else:
-            mapping = input(todo_title + ": ")
+            suggestions = ", ".join(title for title, _ in title_matcher.candidates(todo_title or "", 3))
+            mapping = input(f"{todo_title} [{suggestions}]: ")
             if mapping == "":
                 quote["title"] = todo_title
-                title_map[todo_title] = todo_title
-                save_json("game_map.json", title_map)
+                learn(title_map, todo_title, todo_title, title_matcher)
             else:
                 quote["title"] = mapping
-                title_map[todo_title] = mapping
-                save_json("game_map.json", title_map)
+                learn(title_map, todo_title, mapping, title_matcher)
 
-save_json("quotedata.json", quote_data)
\ No newline at end of file
+save_json("quotedata.json", quote_data)
@@ -1,21 +1,9 @@
-import json
-import csv
-from pathlib import Path
 from collections import defaultdict
 
-
-def open_json(file, default=None):
-    p = Path(file)
-    if not p.exists():
-        return default
-    else:
-        with open(file, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-
-def save_json(file, data):
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+from sheets import streams
+from store import open_json, open_store, save_json, selected_ids
+from streamindex import StreamIndex
+from titlematch import TitleMatcher
 
 
 title_map = open_json("title_map.json", {})
@@ -23,60 +11,67 @@ title_map = open_json("title_map.json", {})
 
 def get_stream_years(title_map):
     stream_years = defaultdict(set)
-    with open("streamdata.tsv", "r", encoding="utf-8") as f:
-        reader = csv.reader(f, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            date, game, stream_nr, src1, src2, src3 = row[0], row[1], row[2], row[3], row[4], row[5]
-            if game in title_map:
-                game = title_map[game]
-
-            year = date[-4:]
-            stream_years[game].add(year)
+    for row in streams("streamdata.tsv"):
+        game = title_map.get(row.game, row.game)
+        if row.year is not None:
+            stream_years[game].add(row.year)
 
     return stream_years
 
 
-quote_data = open_json("quotedata.json", {})
+store = open_store("quotedata.json", only=selected_ids())
+stream_index = StreamIndex("streamdata.tsv", title_map)
+raw_stream_years = get_stream_years({})
 stream_years = get_stream_years(title_map)
-
-for quote_id, quote in quote_data.items():
-    year = quote.get("year", None)
-    if year:
-        quote["year"] = int(year)
-        continue
-
-    if quote["type"] != "Stream":
-        continue
-
-    title = quote.get("title", None)
-    if title is None:
-        print(f"Quote {quote_id} has no title, skipping")
-        continue
-
-    if title not in stream_years:
-        mapping = input(f"Not found in stream years {title}: ")
-        title_map[mapping] = title
-        save_json("title_map.json", title_map)
-        stream_years = get_stream_years(title_map)
-
-    if title not in stream_years:
-        print(f"Still not found in stream years {title}, skipping")
-        continue
-    try:
-        years = sorted([int(y) for y in stream_years[title]])
-    except ValueError:
-        input(f"Failed to convert years for {title}, {stream_years[title]}")
-
-    if len(years) == 1:
-        quote["year"] = years[0]
-    else:
-        year = input(f"Unknown years for {quote['url']}, {years}: ")
-        quote["year"] = int(year)
-
-    save_json("quotedata.json", quote_data)
-
-save_json("quotedata.json", quote_data)
+stream_matcher = TitleMatcher({game: game for game in raw_stream_years})
+
+with store:
+    for quote_id, quote in store.items():
+        year = quote.get("year", None)
+        if year:
+            store.update(quote_id, year=int(year))
+
+    for quote_id, quote in store.items(type="Stream", missing="year"):
+        stream = stream_index.lookup(quote["url"])
+        if stream is not None and stream.year is not None:
+            store.update(quote_id, year=stream.year)
+            continue
+
+        title = quote.get("title", None)
+        if title is None:
+            print(f"Quote {quote_id} has no title, skipping")
+            continue
+
+        if title not in stream_years:
+            # This maps a stream game to the title, and every later run moves all streams of that
+            # game and their years over with it, so a guess is never saved without asking
+            mapping = stream_matcher.match(title)
+            if mapping is not None:
+                answer = input(f"{title} looks like stream game {mapping}, use it? [Y/n]: ")
+                if answer.strip().lower() not in ("", "y", "yes"):
+                    mapping = None
+            if mapping is None:
+                suggestions = ", ".join(game for game, _ in stream_matcher.candidates(title, 3))
+                mapping = input(f"Not found in stream years {title} [{suggestions}]: ")
+            if mapping:
+                title_map[mapping] = title
+                save_json("title_map.json", title_map)
+                if mapping in raw_stream_years:
+                    stream_years[title] |= raw_stream_years[mapping]
+
+        if title not in stream_years:
+            print(f"Still not found in stream years {title}, skipping")
+            continue
+        try:
+            years = sorted([int(y) for y in stream_years[title]])
+        except ValueError:
+            input(f"Failed to convert years for {title}, {stream_years[title]}")
+
+        if len(years) == 1:
+            store.update(quote_id, year=years[0])
+        else:
+            year = input(f"Unknown years for {quote['url']}, {years}: ")
+            store.update(quote_id, year=int(year))
 
 
 # # final check
@@ -1,39 +1,70 @@
-import json
-import csv
-from pathlib import Path
-from collections import defaultdict
-import random
+import argparse
+import itertools
 import datetime
 
+from columnar import write_columnar
+from permutation import SPEC_FILE, PermutationSchedule
+from schedule import Schedule
+from scheduler import SEED, extend_schedule, find_new_quotes, full_shuffle, generate_schedule
+from store import open_json, save_json
+from validate import validate_schedule
 
-def open_json(file, default=None):
-    p = Path(file)
-    if not p.exists():
-        return default
-    else:
-        with open(file, "r", encoding="utf-8") as f:
-            return json.load(f)
-
+parser = argparse.ArgumentParser()
+parser.add_argument("--columnar", action="store_true", help="also write the dictionary-encoded quotes.columnar.json")
+parser.add_argument("--incremental", action="store_true", help="keep the published schedule and only slot in new quotes")
+parser.add_argument("--constrained", action="store_true",
+                    help="space out repeats of the same quote, game and title and balance types per week")
+parser.add_argument("--permutation", action="store_true",
+                    help="publish public/quotes/permutation.json, which maps any date after --freeze-until to a quote, "
+                         "instead of a materialized schedule")
+parser.add_argument("--game-gap", type=int, default=14, help="--constrained: min days between quotes of one game")
+parser.add_argument("--title-gap", type=int, default=14, help="--constrained: min days between quotes of one title")
+parser.add_argument("--freeze-until", default=datetime.datetime.now(datetime.timezone.utc).date().isoformat(),
+                    help="last published date that --incremental and --permutation must not change "
+                         "(default: today, UTC)")
+args = parser.parse_args()
 
-def save_json(file, data):
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+quote_data = open_json("quotedata.json", {})
+state = open_json("shuffle_state.json", {})
 
+if args.permutation:
+    # Nothing to materialize, the spec is the quote list plus a key. Days already shown keep
+    # their quote: an existing spec only gets a new segment for the quotes added since
+    first_open = (datetime.date.fromisoformat(args.freeze_until) + datetime.timedelta(days=1)).isoformat()
+    if SPEC_FILE.exists():
+        permutation = PermutationSchedule.load(SPEC_FILE)
+        added = permutation.extend(quote_data, first_open)
+        print(f"Added {added} new quotes to the permutation from {first_open}")
+    else:
+        permutation = PermutationSchedule.create(quote_data, first_open, SEED)
+        print(f"Started the permutation on {first_open}")
+    sample = permutation.days(permutation.spec["start"], 10)
+    validate_schedule(sample)
+    SPEC_FILE.parent.mkdir(parents=True, exist_ok=True)
+    permutation.save(SPEC_FILE)
+    save_json("quotes_sample.json", sample)
+    raise SystemExit(0)
 
-quote_data = open_json("quotedata.json", {})
-order = list(range(1, len(quote_data) + 1))
-date_start = datetime.date(2025, 3, 31)
-random.seed(11037)
-quotes = {}
-for _ in range(10):
-    random.shuffle(order)
-    
-    for o in order:
-        dt = date_start.strftime("%Y-%m-%d")
-        quotes[dt] = quote_data[str(o)]
-        date_start += datetime.timedelta(days=1)
+if args.incremental:
+    schedule = Schedule.from_dict(open_json("quotes.json", {}))
+    new_quotes = find_new_quotes(quote_data, state.get("scheduled"), schedule)
+    added = extend_schedule(schedule, new_quotes, args.freeze_until, len(quote_data) - len(new_quotes), SEED)
+    print(f"Added {len(new_quotes)} new quotes as {added} days after {args.freeze_until}")
+    quotes = schedule.to_dict()
+elif args.constrained:
+    order, stats = generate_schedule(quote_data, 10, game_gap=args.game_gap, title_gap=args.title_gap, seed=SEED)
+    print(f"Scheduled {stats['days']} days, {stats['relaxed']} had to relax a constraint")
+    quotes = Schedule(datetime.date(2025, 3, 31), [quote_data[qid] for qid in order]).to_dict()
+else:
+    order = full_shuffle(quote_data, 10, SEED)
+    quotes = Schedule(datetime.date(2025, 3, 31), [quote_data[qid] for qid in order]).to_dict()
 
-quotes_sample = {k: quotes[k] for k in list(quotes)[:10]}
+validate_schedule(quotes)
+quotes_sample = dict(itertools.islice(quotes.items(), 10))
 
+# The shards the site loads are written when the schedule is published, by changequotes.save_quotes
 save_json("quotes.json", quotes)
-save_json("quotes_sample.json", quotes_sample)
\ No newline at end of file
+save_json("quotes_sample.json", quotes_sample)
+save_json("shuffle_state.json", {"scheduled": sorted(quote_data, key=int)})
+if args.columnar:
+    write_columnar(quotes, "quotes.columnar.json")
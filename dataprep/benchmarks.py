@@ -0,0 +1,266 @@
+import datetime
+import gc
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+import sheets
+from publish import write_shards
+from schedule import Schedule
+from scheduler import full_shuffle, generate_schedule
+from store import open_json, save_json
+from synth import OUT_DIR, Corpus, generate, is_current
+from titlematch import TitleMatcher, known_titles
+from validate import validate_schedule
+
+RESULTS_FILE = "benchmarks.json"
+# 100x takes about a quarter of an hour, mostly title_lookup at over a minute a run and
+# compressing its shards the first time. 1000x takes hours. Both are opt-in
+DEFAULT_SCALES = (10,)
+# Stop repeating a benchmark once its runs have taken this long, keeping the best so far
+BUDGET = 10.0
+# A benchmark this much slower than the previous run at the same scale is reported
+REGRESSION = 1.2
+LOOKUPS = 2000
+# Schedule days at most, ten rounds of a 1000x corpus would run past the year 9999 date limit
+MAX_DAYS = 1_000_000
+
+
+class Context:
+    """One synthetic corpus on disk plus what the benchmarks build from it, loaded lazily."""
+
+    def __init__(self, directory):
+        self.dir = Path(directory)
+        self.quote_data = open_json(self.dir / "quotedata.json", {})
+        self.title_map = open_json(self.dir / "title_map.json", {})
+        self._quotes = None
+        self._matcher = None
+
+    def path(self, name):
+        return str(self.dir / name)
+
+    @property
+    def quotes(self):
+        if self._quotes is None:
+            rounds = max(1, min(10, MAX_DAYS // max(1, len(self.quote_data))))
+            order = full_shuffle(self.quote_data, rounds)
+            self._quotes = Schedule(datetime.date(2025, 3, 31), [self.quote_data[q] for q in order]).to_dict()
+        return self._quotes
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = self.build_matcher()
+        return self._matcher
+
+    def build_matcher(self):
+        return TitleMatcher(known_titles(self.title_map, self.path("streamdata.tsv"), self.path("joevideotypes.tsv")))
+
+
+def bench_parse_tsv(ctx):
+    return sum(len(list(parse(ctx.path(name)))) for name, parse in (
+        ("quotestodo.tsv", sheets.iter_quotes),
+        ("streamdata.tsv", sheets.iter_streams),
+        ("joevideotypes.tsv", sheets.iter_videos),
+    ))
+
+
+def bench_parse_tsv_cached(ctx):
+    return len(sheets.quotes(ctx.path("quotestodo.tsv"))) + len(sheets.streams(ctx.path("streamdata.tsv"))) \
+        + len(sheets.videos(ctx.path("joevideotypes.tsv")))
+
+
+def bench_title_index(ctx):
+    return len(ctx.build_matcher())
+
+
+def bench_title_lookup(ctx):
+    rng = random.Random(0)
+    raw = [row.title for row in sheets.quotes(ctx.path("quotestodo.tsv"))]
+    matcher = ctx.matcher
+    return sum(matcher.match(title) is not None for title in rng.sample(raw, min(LOOKUPS, len(raw))))
+
+
+def bench_shuffle(ctx):
+    return len(full_shuffle(ctx.quote_data, 10))
+
+
+def bench_generate_schedule(ctx):
+    return len(generate_schedule(ctx.quote_data, rounds=1)[0])
+
+
+def _edit_schedule(ctx, **edits):
+    # What changequotes.insert_quote/remove_quote do, minus the fixed public/ path
+    schedule = Schedule.load(ctx.path("quotes.json"))
+    schedule.apply(**edits)
+    return len(schedule.to_dict())
+
+
+def bench_insert_quote(ctx):
+    middle = Schedule.from_dict(ctx.quotes).date(len(ctx.quotes) // 2)
+    return _edit_schedule(ctx, inserts=[(middle, {"quote": "Benchmark", "title": "Benchmark", "url": "",
+                                                  "year": 2025, "type": "Other", "game": "Benchmark"})])
+
+
+def bench_remove_quote(ctx):
+    return _edit_schedule(ctx, removes=[Schedule.from_dict(ctx.quotes).date(len(ctx.quotes) // 2)])
+
+
+def bench_validate(ctx):
+    validate_schedule(ctx.quotes)
+    return len(ctx.quotes)
+
+
+def bench_republish_shards(ctx):
+    # Shards already published are left alone, as on every save_quotes after the first,
+    # so this is the hashing and dumping of every month without any compression
+    return len(write_shards(ctx.quotes, ctx.path("shards"))["shards"])
+
+
+def _prepare(ctx):
+    """Setup that shouldn't be timed: warm the TSV caches, write the schedule file the edits load and
+    publish the shards once, which compresses every one of them the first time a corpus is used."""
+    bench_parse_tsv_cached(ctx)
+    bench_republish_shards(ctx)
+    with open(ctx.path("quotes.json"), "w", encoding="utf-8") as f:
+        json.dump(ctx.quotes, f, indent=4, ensure_ascii=False)
+    ctx.matcher
+
+
+BENCHMARKS = {
+    "parse_tsv": bench_parse_tsv,
+    "parse_tsv_cached": bench_parse_tsv_cached,
+    "title_index": bench_title_index,
+    "title_lookup": bench_title_lookup,
+    "shuffle": bench_shuffle,
+    "generate_schedule": bench_generate_schedule,
+    "insert_quote": bench_insert_quote,
+    "remove_quote": bench_remove_quote,
+    "validate": bench_validate,
+    "republish_shards": bench_republish_shards,
+}
+
+
+def measure(fn, ctx, repeat, budget=BUDGET):
+    """Returns (best wall seconds over up to repeat runs, peak traced bytes, fn's result).
+
+    The timed runs go without tracemalloc, which slows allocation-heavy code down
+    several times over. One extra traced run gives the peak.
+    """
+    best = None
+    spent = 0.0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn(ctx)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        if spent >= budget:
+            break
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(ctx)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def describe(e):
+    lines = str(e).splitlines()
+    return f"{type(e).__name__}: {lines[0]}" if lines else type(e).__name__
+
+
+def git_rev():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return rev.stdout.strip() + ("+dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales, names=None, repeat=3, seed=0):
+    """Runs the benchmarks at each scale, generating corpora that aren't on disk yet. Returns a run record."""
+    corpus = None
+    record = {
+        "rev": git_rev(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": {},
+    }
+    for scale in scales:
+        directory = Path(OUT_DIR) / f"{scale}x"
+        if not is_current(directory, scale, seed):
+            corpus = corpus or Corpus()
+            generate(scale, directory, seed, corpus)
+        ctx = Context(directory)
+        results = record["results"][str(scale)] = {}
+        try:
+            _prepare(ctx)
+        except Exception as e:
+            # Nothing at this scale can run, the other scales still can
+            results["prepare"] = {"error": describe(e)}
+            print(f"{scale:>5}x {'prepare':<18} failed, {describe(e)}")
+            continue
+        for name, fn in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            try:
+                seconds, peak, count = measure(fn, ctx, repeat)
+            except Exception as e:
+                # Recorded as failed, one broken code path shouldn't cost the rest of the run
+                results[name] = {"error": describe(e)}
+                print(f"{scale:>5}x {name:<18} failed, {describe(e)}")
+                continue
+            results[name] = {"seconds": round(seconds, 6), "peak_bytes": peak, "items": count}
+            print(f"{scale:>5}x {name:<18} {seconds * 1000:>10.1f}ms {peak / 1e6:>9.1f}MB peak")
+    return record
+
+
+def regressions(record, previous, threshold=REGRESSION):
+    """Returns (scale, name, old seconds, new seconds) for every benchmark that got slower than threshold."""
+    found = []
+    for scale, results in record["results"].items():
+        for name, result in results.items():
+            old = previous["results"].get(scale, {}).get(name)
+            if old and "seconds" in old and "seconds" in result and result["seconds"] > old["seconds"] * threshold:
+                found.append((scale, name, old["seconds"], result["seconds"]))
+    return found
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time the dataprep and scheduling code paths on synthetic corpora")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="corpus sizes as multiples of the real one (default: 10)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run just these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--results", default=RESULTS_FILE)
+    parser.add_argument("--no-save", action="store_true", help="compare against the last run without recording this one")
+    args = parser.parse_args()
+
+    record = run(args.scales, args.only, args.repeat)
+    history = open_json(args.results, [])
+    if history:
+        previous = history[-1]
+        found = regressions(record, previous)
+        print(f"\nCompared to {previous['rev']} ({previous['date']}): "
+              f"{len(found)} benchmark{'s' if len(found) != 1 else ''} over {REGRESSION}x slower")
+        for scale, name, old, new in found:
+            print(f"  {scale}x {name}: {old * 1000:.1f}ms -> {new * 1000:.1f}ms ({new / old:.2f}x)")
+    if not args.no_save:
+        history.append(record)
+        save_json(args.results, history)
+    failed = [f"{scale}x {name}" for scale, results in record["results"].items()
+              for name, result in results.items() if "error" in result]
+    if failed:
+        raise SystemExit(f"{len(failed)} benchmark{'s' if len(failed) != 1 else ''} failed: {', '.join(failed)}")
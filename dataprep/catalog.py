@@ -0,0 +1,33 @@
+FIELDS = ["label", "type", "game", "year", "key"]
+
+# Placeholder days, not something a player can guess
+PLACEHOLDERS = ("RESERVED", "NOQUOTE")
+
+
+def option_label(quote):
+    return f"{quote['type']} - {quote['title']}"
+
+
+def build_catalog(quotes):
+    """Builds the deduplicated list of "Type - Title" guesses from a date -> quote schedule.
+
+    Options are sorted by label and an option's ID is its position in the list. Like
+    the client used to, the first scheduled quote with a given label supplies its
+    type, game and year. Each row also carries the lowercase search key the
+    autocomplete filters on. RESERVED/NOQUOTE placeholder days are left out.
+    """
+    first = {}
+    for quote in quotes.values():
+        if quote and quote.get("type") and quote.get("title") and quote.get("quote") not in PLACEHOLDERS:
+            first.setdefault(option_label(quote), quote)
+
+    options = []
+    for label in sorted(first):
+        quote = first[label]
+        options.append([label, quote["type"], quote.get("game"), quote.get("year"), label.lower()])
+    return {"fields": FIELDS, "options": options}
+
+
+def option_ids(catalog):
+    """Returns label -> option ID for a catalog built by build_catalog."""
+    return {row[0]: i for i, row in enumerate(catalog["options"])}
@@ -0,0 +1,115 @@
+import datetime
+import json
+
+from ytfetch import video_id
+
+LISTING_FIXTURES = ["fixtures/channel_listing.json", "fixtures/stream_listing.json"]
+CHANNEL = "Joseph Anderson"
+
+
+def fetch_listing(url, path):
+    """Dumps a flat channel/playlist listing to path, the same as `yt-dlp --flat-playlist -J url`."""
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL({"quiet": True, "extract_flat": "in_playlist"}) as ydl:
+        listing = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(listing, f, ensure_ascii=False)
+    return listing
+
+
+def _upload_date(entry):
+    if entry.get("upload_date"):
+        return entry["upload_date"]
+    timestamp = entry.get("timestamp") or entry.get("release_timestamp")
+    if timestamp:
+        return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y%m%d")
+    return None
+
+
+def _walk(playlist, channel):
+    # Channel pages nest one playlist per tab (Videos, Live, ...) inside the top level one
+    channel = playlist.get("channel") or playlist.get("uploader") or channel
+    for entry in playlist.get("entries") or ():
+        if entry is None:
+            continue
+        if entry.get("entries") is not None:
+            yield from _walk(entry, channel)
+        else:
+            yield entry, entry.get("channel") or entry.get("uploader") or channel
+
+
+def build_table(*listings):
+    """Returns video ID -> {channel, title, upload_date} for every video in the listings."""
+    table = {}
+    for listing in listings:
+        for entry, channel in _walk(listing, None):
+            vid = entry.get("id") if len(entry.get("id") or "") == 11 else video_id(entry.get("url"))
+            if vid:
+                table[vid] = {"channel": channel, "title": entry.get("title"), "upload_date": _upload_date(entry)}
+    return table
+
+
+def load_table(*paths):
+    listings = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            listings.append(json.load(f))
+    return build_table(*listings)
+
+
+def missing_ids(urls, table):
+    """Video IDs in urls the table can't classify on its own.
+
+    A video missing from the table needs extracting, and so does one of Joe's own
+    videos listed without an upload date, since that's where its year comes from.
+    """
+    ids = dict.fromkeys(vid for vid in map(video_id, urls) if vid)
+    return [
+        vid for vid in ids
+        if vid not in table or (table[vid]["channel"] == CHANNEL and not table[vid]["upload_date"])
+    ]
+
+
+def classify(meta):
+    """Joe's own uploads are YouTube videos, anything on another channel is a stream VOD."""
+    return "YouTube" if meta["channel"] == CHANNEL else "Stream"
+
+
+def merge_metadata(listed, fetched):
+    """Listing entries updated with extraction results, leaving out extractions that failed (None)."""
+    return {**listed, **{vid: meta for vid, meta in fetched.items() if meta is not None}}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from store import open_json
+
+    parser = argparse.ArgumentParser(description="Classify quotedata.json from saved channel listings, without network")
+    parser.add_argument("listings", nargs="*", default=LISTING_FIXTURES)
+    parser.add_argument("--fetch", metavar="URL", help="dump a listing of URL to the first listing path first")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_listing(args.fetch, args.listings[0])
+
+    table = load_table(*args.listings)
+    quote_data = open_json("quotedata.json", {})
+    urls = [q["url"] for q in quote_data.values()]
+
+    mismatched = 0
+    listed = 0
+    for quote in quote_data.values():
+        meta = table.get(video_id(quote["url"]))
+        if meta is None:
+            continue
+        listed += 1
+        kind = classify(meta)
+        if quote.get("type") in ("YouTube", "Stream") and quote["type"] != kind:
+            mismatched += 1
+            print(f"{quote['url']}: listing says {kind}, quotedata.json says {quote['type']}")
+
+    missing = missing_ids(urls, table)
+    print(f"{len(table)} listed videos, {listed} quotes classified from the listings, {mismatched} disagree")
+    print(f"{len(missing)} videos would still need a per-URL extraction")
@@ -0,0 +1,190 @@
+# joedle-data, one entry point for the dataprep stages and schedule edits:
+#
+#     python cli.py fetch --workers 16
+#     python cli.py insert 2025-09-05 --placeholder NOQUOTE
+#     python cli.py bench
+#     python cli.py --report run_report.json --profile shuffle.prof shuffle
+#
+# Nothing outside the standard library is imported until a command is picked, and
+# then only what that command uses, so `validate` or `--help` never pay for the
+# network or numeric dependencies of the other commands.
+import os
+import sys
+
+DATAPREP = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(DATAPREP)
+
+# command -> (script run as __main__, modules it imports, help)
+SCRIPTS = {
+    "start": ("1.startdata.py", ["dedup", "search", "sheets", "store"], "build quotedata.json from quotestodo.tsv"),
+    "fetch": ("2.fillyoutube.py", ["channelindex", "store", "ytfetch"], "fill type, title and year from YouTube"),
+    "stream": ("3.fillstream.py", ["sheets", "store", "streamindex", "titlematch"], "fill stream titles"),
+    "years": ("4.years.py", ["sheets", "store", "streamindex", "titlematch"], "fill stream years"),
+    "game": ("5.game.py", ["store"], "fill games"),
+    "shuffle": ("6.shuffle.py", ["columnar", "permutation", "schedule", "scheduler", "validate"],
+                "build quotes.json"),
+    "validate": ("validate.py", ["validate"], "check quotedata.json and the schedules"),
+    "run": ("pipeline.py", ["pipeline"], "run the stages whose inputs changed"),
+    "search": ("search.py", ["search"], 'search quotes, titles and games ("phrase", prefix*)'),
+    "difficulty": ("difficulty.py", ["difficulty"], "simulate guesses per scheduled day (needs numpy)"),
+}
+EDITS = {
+    "insert": (["changequotes"], "insert a quote into public/quotes.json, shifting later days"),
+    "remove": (["changequotes"], "remove a day from public/quotes.json, shifting later days back"),
+}
+
+
+def run_script(script, argv):
+    import runpy
+
+    sys.argv = [script, *argv]
+    runpy.run_path(os.path.join(DATAPREP, script), run_name="__main__")
+
+
+def _changequotes():
+    # changequotes.py works on public/ relative to the repo root
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import changequotes
+    return changequotes
+
+
+def insert(argv):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(prog="cli.py insert", description=EDITS["insert"][1])
+    parser.add_argument("date")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--json", help="file holding the quote object")
+    group.add_argument("--placeholder", choices=["RESERVED", "NOQUOTE"])
+    parser.add_argument("--permutation", action="store_true", help="edit public/quotes/permutation.json instead")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        with open(args.json, "r", encoding="utf-8") as f:
+            quote = json.load(f)
+    changequotes = _changequotes()
+    if args.placeholder:
+        from schedule import placeholder
+        quote = placeholder(args.placeholder, int(args.date[:4]))
+    if not args.permutation:
+        changequotes.apply_changes(inserts=[(args.date, quote)])
+        return
+    try:
+        changequotes.apply_permutation_changes(inserts=[(args.date, quote)])
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+
+
+def remove(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="cli.py remove", description=EDITS["remove"][1])
+    parser.add_argument("date")
+    parser.add_argument("--permutation", action="store_true", help="edit public/quotes/permutation.json instead")
+    args = parser.parse_args(argv)
+    changequotes = _changequotes()
+    if args.permutation:
+        try:
+            changequotes.apply_permutation_changes(removes=[args.date])
+        except KeyError as e:
+            raise SystemExit(e.args[0])
+        return
+    if args.date not in changequotes.load_schedule():
+        raise SystemExit(f"No quote found for date: {args.date}")
+    changequotes.apply_changes(removes=[args.date])
+
+
+def prepare(command):
+    """Imports what a command needs without running it, for bench()."""
+    sys.path.insert(0, DATAPREP)
+    sys.path.insert(0, ROOT)
+    modules = SCRIPTS[command][1] if command in SCRIPTS else EDITS[command][0]
+    for module in modules:
+        __import__(module)
+
+
+def bench(argv):
+    """Times a cold interpreter that starts up, imports a command's modules and exits."""
+    import argparse
+    import subprocess
+    import time
+
+    parser = argparse.ArgumentParser(prog="cli.py bench", description="cold start time per command")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    def cold(code):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=DATAPREP, check=True)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    baseline = cold("pass")
+    print(f"{'python -c pass':<14} {baseline * 1000:7.1f} ms")
+    print(f"{'cli.py --help':<14} {cold('import cli') * 1000:7.1f} ms")
+    for command in [*SCRIPTS, *EDITS]:
+        try:
+            elapsed = cold(f"import cli; cli.prepare({command!r})")
+        except subprocess.CalledProcessError:
+            print(f"{command:<14}  failed, a dependency is missing")
+            continue
+        print(f"{command:<14} {elapsed * 1000:7.1f} ms  (+{(elapsed - baseline) * 1000:.1f} ms over bare python)")
+
+
+def usage():
+    lines = ["usage: cli.py [--report FILE] [--profile FILE] <command> [args]", ""]
+    for command, (script, _, text) in SCRIPTS.items():
+        lines.append(f"  {command:<11} {text} ({script})")
+    for command, (_, text) in EDITS.items():
+        lines.append(f"  {command:<11} {text}")
+    lines.append(f"  {'bench':<11} time the cold start of every command")
+    return "\n".join(lines)
+
+
+def dispatch(command, rest):
+    if command in SCRIPTS:
+        # The stage scripts open their files relative to dataprep/
+        os.chdir(DATAPREP)
+        sys.path.insert(0, DATAPREP)
+        run_script(SCRIPTS[command][0], rest)
+    elif command in EDITS or command == "bench":
+        sys.path.insert(0, DATAPREP)
+        {"insert": insert, "remove": remove, "bench": bench}[command](rest)
+    else:
+        raise SystemExit(f"Unknown command {command!r}\n\n{usage()}")
+
+
+def main(argv):
+    # Leading --report/--profile run the command under instrument.Measure
+    options = {}
+    while len(argv) >= 2 and argv[0] in ("--report", "--profile"):
+        options[argv[0][2:]] = os.path.abspath(argv[1])
+        argv = argv[2:]
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    if not options:
+        dispatch(argv[0], argv[1:])
+        return
+
+    sys.path.insert(0, DATAPREP)
+    from instrument import Measure, append_record
+
+    code = 0
+    with Measure(argv[0], options.get("profile")) as measure:
+        try:
+            dispatch(argv[0], argv[1:])
+        except SystemExit as e:
+            code = e.code
+    measure.record.update(argv=argv[1:], exit_code=code if isinstance(code, int) or code is None else 1)
+    append_record(options.get("report", os.path.join(DATAPREP, "run_report.json")), measure.record)
+    raise SystemExit(code)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
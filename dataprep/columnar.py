@@ -0,0 +1,145 @@
+import datetime
+import json
+import time
+
+FORMAT = "joedle-columnar"
+VERSION = 1
+
+# Fields whose values repeat across quotes and get a string table each
+INTERNED = ("title", "game", "type")
+
+
+def _contiguous_start(dates):
+    """Returns the first date if dates are consecutive days in order, else None."""
+    if not dates:
+        return None
+    start = datetime.date.fromisoformat(dates[0])
+    for offset, date_str in enumerate(dates):
+        if date_str != (start + datetime.timedelta(days=offset)).isoformat():
+            return None
+    return dates[0]
+
+
+def encode(quotes):
+    """Encodes a date -> quote schedule into the dictionary-encoded columnar layout.
+
+    Distinct quotes are stored once as rows and each day is a single row index.
+    Within a row, title/game/type are indexes into per-field string tables. Rows are
+    stored in the key order of their "shape", so entries with missing or reordered
+    keys still round-trip exactly. Dates collapse to a start date when they are
+    consecutive.
+    """
+    tables = {field: [] for field in INTERNED}
+    table_index = {field: {} for field in INTERNED}
+    shapes, shape_index = [], {}
+    rows, row_index = [], {}
+    days = []
+
+    for quote in quotes.values():
+        key = json.dumps(quote, ensure_ascii=False)
+        row = row_index.get(key)
+        if row is None:
+            shape = tuple(quote)
+            if shape not in shape_index:
+                shape_index[shape] = len(shapes)
+                shapes.append(list(shape))
+            values = [shape_index[shape]]
+            for field, value in quote.items():
+                if field in INTERNED:
+                    ref = table_index[field].get(value)
+                    if ref is None:
+                        ref = table_index[field][value] = len(tables[field])
+                        tables[field].append(value)
+                    value = ref
+                values.append(value)
+            row = row_index[key] = len(rows)
+            rows.append(values)
+        days.append(row)
+
+    data = {"format": FORMAT, "version": VERSION}
+    dates = list(quotes)
+    start = _contiguous_start(dates)
+    if start is not None:
+        data["start"] = start
+    else:
+        data["dates"] = dates
+    data.update({"shapes": shapes, "strings": tables, "quotes": rows, "days": days})
+    return data
+
+
+def decode(data):
+    """Rebuilds the date -> quote schedule from encode() output."""
+    if data.get("format") != FORMAT or data.get("version") != VERSION:
+        raise ValueError(f"Not a {FORMAT} v{VERSION} file")
+    shapes = data["shapes"]
+    tables = data["strings"]
+
+    decoded = []
+    for values in data["quotes"]:
+        quote = {}
+        for field, value in zip(shapes[values[0]], values[1:]):
+            quote[field] = tables[field][value] if field in tables else value
+        decoded.append(quote)
+
+    if "start" in data:
+        start = datetime.date.fromisoformat(data["start"])
+        dates = [(start + datetime.timedelta(days=i)).isoformat() for i in range(len(data["days"]))]
+    else:
+        dates = data["dates"]
+    # Each day gets its own dict, the same as json.load would give
+    return {date_str: dict(decoded[row]) for date_str, row in zip(dates, data["days"])}
+
+
+def dumps(quotes):
+    return json.dumps(encode(quotes), ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(text):
+    return decode(json.loads(text))
+
+
+def write_columnar(quotes, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(quotes))
+
+
+def read_columnar(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return loads(f.read())
+
+
+def compare(quotes, repeat=20):
+    """Returns {name: (bytes, parse seconds)} for the current JSON layouts and the columnar one."""
+
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    variants = {
+        "json indent=4": json.dumps(quotes, indent=4, ensure_ascii=False),
+        "json minified": json.dumps(quotes, ensure_ascii=False, separators=(",", ":")),
+    }
+    results = {name: (len(text.encode("utf-8")), best(lambda: json.loads(text))) for name, text in variants.items()}
+    text = dumps(quotes)
+    results["columnar"] = (len(text.encode("utf-8")), best(lambda: loads(text)))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "quotes.json"
+    with open(path, "r", encoding="utf-8") as f:
+        quotes = json.load(f)
+
+    assert loads(dumps(quotes)) == quotes, "columnar round trip is lossy"
+    assert list(loads(dumps(quotes))) == list(quotes), "columnar round trip reorders dates"
+
+    results = compare(quotes)
+    baseline = results["json indent=4"][0]
+    for name, (size, seconds) in results.items():
+        print(f"{name:>14}: {size:>9,} bytes ({size / baseline:6.1%})  parse {seconds * 1000:7.2f} ms")
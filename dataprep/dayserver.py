@@ -0,0 +1,121 @@
+import datetime
+import gzip
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from catalog import build_catalog
+from publish import content_hash, dump_compact
+from schedule import Schedule
+
+QUOTES_FILE = "../public/quotes.json"
+# Days that have gone by rarely change, but nothing stops changequotes.py or a full
+# 6.shuffle.py run from rewriting them, so they're revalidated daily rather than immutable
+PAST_MAX_AGE = 24 * 3600
+# Future days can still move around when a quote gets inserted or removed
+FUTURE_MAX_AGE = 3600
+
+Response = namedtuple("Response", ["body", "gzip", "etag", "gzip_etag", "date"])
+
+
+def _response(data, date=None):
+    body = dump_compact(data)
+    etag = f'"{content_hash(body)}"'
+    return Response(body, gzip.compress(body, 9, mtime=0), etag, etag[:-1] + '-gz"', date)
+
+
+def build_responses(quotes):
+    """Returns path -> Response with every byte the server will ever send precomputed.
+
+    /day/<date> holds that day's quote, /catalog the guess list, and /quotes.json the
+    whole schedule, to compare against what the static site serves today.
+    """
+    responses = {f"/day/{date_str}": _response(quote, date_str) for date_str, quote in quotes.items()}
+    responses["/catalog"] = _response(build_catalog(quotes))
+    responses["/quotes.json"] = _response(quotes)
+    return responses
+
+
+def cache_control(response, now):
+    if response.date is None:
+        return f"public, max-age={FUTURE_MAX_AGE}"
+    today = now.date().isoformat()
+    if response.date < today:
+        return f"public, max-age={PAST_MAX_AGE}"
+    if response.date == today:
+        # Good until the next UTC midnight, which also keeps /day/today from going stale
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), now.tzinfo)
+        return f"public, max-age={max(int((midnight - now).total_seconds()), 1)}"
+    return f"public, max-age={FUTURE_MAX_AGE}"
+
+
+def make_handler(responses):
+    class DayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            response = responses.get(path)
+            if response is None:
+                if path == "/day/today":
+                    today = datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+                    response = responses.get(f"/day/{today}")
+                if response is None:
+                    self._send(404, b'{"error":"not found"}', {"Content-Type": "application/json"})
+                    return
+
+            zipped = "gzip" in self.headers.get("Accept-Encoding", "")
+            etag = response.gzip_etag if zipped else response.etag
+            headers = {
+                "ETag": etag,
+                "Cache-Control": cache_control(response, datetime.datetime.now(datetime.timezone.utc)),
+                "Vary": "Accept-Encoding",
+            }
+            if etag in self.headers.get("If-None-Match", ""):
+                self._send(304, b"", headers)
+                return
+            headers["Content-Type"] = "application/json; charset=utf-8"
+            if zipped:
+                headers["Content-Encoding"] = "gzip"
+            self._send(200, response.gzip if zipped else response.body, headers)
+
+        def _send(self, status, body, headers):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return DayHandler
+
+
+class DayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops connections at the midnight rush,
+    # and each dropped SYN costs the client a full second before it retries
+    request_queue_size = 1024
+
+
+def make_server(quotes, host="127.0.0.1", port=8080):
+    return DayServer((host, port), make_handler(build_responses(quotes)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve each day's quote from precomputed responses")
+    parser.add_argument("--quotes", default=QUOTES_FILE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server = make_server(Schedule.load(args.quotes).to_dict(), args.host, args.port)
+    print(f"Serving /day/<date>, /day/today, /catalog and /quotes.json on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
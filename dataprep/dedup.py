@@ -0,0 +1,107 @@
+from collections import Counter, defaultdict
+
+from titlematch import normalize
+from ytfetch import timestamp, video_id
+
+SHINGLE = 3  # words per shingle
+OVERLAP = 0.6  # min share of the shorter quote's shingles the longer one has to contain
+NEARBY = 120  # seconds between two quotes from one video that likely cover the same moment
+
+
+def shingles(text, k=SHINGLE):
+    words = normalize(text).split()
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def shingle_index(sets):
+    """shingle -> IDs of the quotes containing it."""
+    index = defaultdict(list)
+    for qid, shingle_set in sets.items():
+        for shingle in shingle_set:
+            index[shingle].append(qid)
+    return index
+
+
+def shared_shingles(sets, index, only=None):
+    """Returns {(a, b): shared shingles} for every pair of quotes sharing at least one.
+
+    Counting through the shingle index finds every pair that shares anything, however
+    different their lengths, which MinHash banding doesn't: it picks by Jaccard
+    similarity, and an excerpt of a long quote has a low one. With `only`, just the
+    pairs involving those quotes are counted.
+    """
+    pairs = {}
+    for a in sets if only is None else [qid for qid in sets if qid in only]:
+        shared = Counter(b for shingle in sets[a] for b in index[shingle] if b != a)
+        for b, count in shared.items():
+            pairs[tuple(sorted((a, b), key=int))] = count
+    return pairs
+
+
+def text_duplicates(quotes, threshold=OVERLAP, only=None):
+    """Returns (id, id, score) for quotes whose text overlaps by at least threshold.
+
+    The score is the share of the smaller shingle set found in the larger, so an
+    excerpt of a longer quote scores high.
+    """
+    sets = {qid: shingles(q.get("quote") or "") for qid, q in quotes.items()}
+    sets = {qid: s for qid, s in sets.items() if s}
+    found = []
+    for (a, b), shared in shared_shingles(sets, shingle_index(sets), only).items():
+        score = shared / min(len(sets[a]), len(sets[b]))
+        if score >= threshold:
+            found.append((a, b, score))
+    return found
+
+
+def nearby_duplicates(quotes, window=NEARBY):
+    """Returns (id, id, seconds apart) for quotes from one video less than window seconds apart."""
+    by_video = defaultdict(list)
+    for qid, quote in quotes.items():
+        vid = video_id(quote.get("url") or "")
+        if vid:
+            by_video[vid].append((timestamp(quote["url"]), qid))
+    found = []
+    for entries in by_video.values():
+        entries.sort()
+        for i, (t, a) in enumerate(entries):
+            for t2, b in entries[i + 1:]:
+                if t2 - t >= window:
+                    break
+                found.append((a, b, t2 - t))
+    return found
+
+
+def find_duplicates(quotes, only=None):
+    """Flags likely duplicates as (id, id, reason) triples, sorted by ID.
+
+    With `only` given, pairs where neither quote is in it are left out, so the
+    corpus that's already been reviewed isn't reported again on every run.
+    """
+    flagged = {}
+    for a, b, score in text_duplicates(quotes, only=only):
+        flagged[tuple(sorted((a, b), key=int))] = f"{score:.0%} of the text overlaps"
+    for a, b, seconds in nearby_duplicates(quotes):
+        pair = tuple(sorted((a, b), key=int))
+        reason = f"same video, {seconds}s apart"
+        flagged[pair] = f"{flagged[pair]}, {reason}" if pair in flagged else reason
+    return [
+        (a, b, reason) for (a, b), reason in sorted(flagged.items(), key=lambda x: (int(x[0][0]), int(x[0][1])))
+        if only is None or a in only or b in only
+    ]
+
+
+if __name__ == "__main__":
+    import time
+
+    from store import open_json
+
+    quote_data = open_json("quotedata.json", {})
+    start = time.perf_counter()
+    flagged = find_duplicates(quote_data)
+    elapsed = time.perf_counter() - start
+    for a, b, reason in flagged:
+        print(f"{a} / {b}: {reason}")
+    print(f"{len(flagged)} likely duplicates among {len(quote_data)} quotes ({elapsed * 1000:.0f} ms)")
@@ -0,0 +1,176 @@
+import numpy as np
+
+from catalog import PLACEHOLDERS, build_catalog, option_ids, option_label
+
+# Same limit as MAX_GUESSES in App.vue, a game that isn't won by then counts as MAX_GUESSES + 1
+MAX_GUESSES = 10
+
+# Feedback for a (guess, answer) pair, packed into one small int:
+# bit 0 type match, bit 1 game match, bits 2-3 the year clue
+YEAR_CORRECT, YEAR_LOWER, YEAR_HIGHER, YEAR_UNKNOWN = 0, 1, 2, 3
+FEEDBACK_VALUES = 16
+
+
+class Catalog:
+    """The guessable options of a schedule as parallel arrays, indexed by option ID."""
+
+    def __init__(self, catalog):
+        rows = catalog["options"]
+        self.labels = [row[0] for row in rows]
+        self.ids = option_ids(catalog)
+        self.type = self._codes([row[1] for row in rows])
+        self.game = self._codes([row[2] for row in rows])
+        self.year = np.array([np.nan if row[3] is None else float(row[3]) for row in rows])
+
+    @staticmethod
+    def _codes(values):
+        codes = {}
+        return np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def feedback_matrix(catalog):
+    """F[g, a] is the feedback guessing option g gets when option a is the answer.
+
+    Mirrors submitGuess/compareYears: the year clue is "lower" when the guessed year
+    is below the answer's, "unknown" when either year is missing.
+    """
+    g_year = catalog.year[:, None]
+    a_year = catalog.year[None, :]
+    year = np.full((len(catalog), len(catalog)), YEAR_CORRECT, dtype=np.uint8)
+    year[g_year < a_year] = YEAR_LOWER
+    year[g_year > a_year] = YEAR_HIGHER
+    year[np.isnan(g_year) | np.isnan(a_year)] = YEAR_UNKNOWN
+
+    type_match = catalog.type[:, None] == catalog.type[None, :]
+    game_match = catalog.game[:, None] == catalog.game[None, :]
+    return (type_match | (game_match << 1) | (year << 2)).astype(np.uint8)
+
+
+def _narrow(feedback, candidates, guess, answer):
+    """Candidates still consistent with guessing `guess` when `answer` is right."""
+    narrowed = candidates & (feedback[guess] == feedback[guess, answer])
+    narrowed[guess] = False
+    return narrowed
+
+
+class GreedySolver:
+    """Guesses the option that leaves the fewest candidates in expectation.
+
+    For every possible guess the remaining candidates split into groups by the
+    feedback they'd produce, and the expected number left afterwards is the sum of
+    squared group sizes over the candidate count. Candidates win ties, since they
+    might be right outright. Picks only depend on the candidate set, so they're
+    memoized across answers.
+    """
+
+    def __init__(self, feedback):
+        self.feedback = feedback
+        self.values = np.arange(FEEDBACK_VALUES, dtype=np.uint8)
+        self.memo = {}
+
+    def pick(self, candidates):
+        key = candidates.tobytes()
+        if key not in self.memo:
+            idx = np.flatnonzero(candidates)
+            if len(idx) <= 2:
+                self.memo[key] = int(idx[0])
+            else:
+                # sizes[g, v]: candidates that give feedback v when g is guessed
+                sizes = (self.feedback[:, idx][:, :, None] == self.values).sum(axis=1)
+                score = (sizes.astype(np.int64) ** 2).sum(axis=1) * 2 - candidates
+                self.memo[key] = int(np.argmin(score))
+        return self.memo[key]
+
+    def solve(self, answer):
+        candidates = np.ones(len(self.feedback), dtype=bool)
+        for count in range(1, MAX_GUESSES + 1):
+            guess = self.pick(candidates)
+            if guess == answer:
+                return count
+            candidates = _narrow(self.feedback, candidates, guess, answer)
+        return MAX_GUESSES + 1
+
+
+class RandomSolver:
+    """Guesses uniformly among the options that are still consistent with every clue."""
+
+    def __init__(self, feedback, rng):
+        self.feedback = feedback
+        self.rng = rng
+
+    def solve(self, answer):
+        candidates = np.ones(len(self.feedback), dtype=bool)
+        for count in range(1, MAX_GUESSES + 1):
+            guess = int(self.rng.choice(np.flatnonzero(candidates)))
+            if guess == answer:
+                return count
+            candidates = _narrow(self.feedback, candidates, guess, answer)
+        return MAX_GUESSES + 1
+
+
+def answer_stats(catalog, trials=200, seed=0):
+    """Returns {option ID: {"greedy", "random", "random_lost"}} for every option.
+
+    greedy is the greedy solver's guess count, random the mean over `trials` random
+    games, random_lost the share of those that ran out of guesses.
+    """
+    feedback = feedback_matrix(catalog)
+    greedy = GreedySolver(feedback)
+    naive = RandomSolver(feedback, np.random.default_rng(seed))
+    stats = {}
+    for answer in range(len(catalog)):
+        counts = np.array([naive.solve(answer) for _ in range(trials)])
+        stats[answer] = {
+            "greedy": greedy.solve(answer),
+            "random": round(float(counts.mean()), 2),
+            "random_lost": round(float((counts > MAX_GUESSES).mean()), 3),
+        }
+    return stats
+
+
+def simulate(quotes, trials=200, seed=0):
+    """Returns date -> expected guess counts for every day of a date -> quote schedule.
+
+    A day's difficulty only depends on which option is the answer, so each option is
+    simulated once and the schedule, however many rounds long, is just a lookup.
+    Placeholder days get None.
+    """
+    catalog = Catalog(build_catalog(quotes))
+    stats = answer_stats(catalog, trials, seed)
+    days = {}
+    for date_str, quote in quotes.items():
+        if quote.get("quote") in PLACEHOLDERS:
+            days[date_str] = None
+        else:
+            days[date_str] = stats[catalog.ids[option_label(quote)]]
+    return days
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from store import open_json, save_json
+
+    parser = argparse.ArgumentParser(description="Estimate how many guesses each scheduled day takes")
+    parser.add_argument("schedule", nargs="?", default="quotes.json")
+    parser.add_argument("--out", default="difficulty.json")
+    parser.add_argument("--trials", type=int, default=200, help="random games per answer")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    quotes = open_json(args.schedule, {})
+    start = time.perf_counter()
+    days = simulate(quotes, args.trials, args.seed)
+    elapsed = time.perf_counter() - start
+    save_json(args.out, days)
+
+    scored = [d for d in days.values() if d is not None]
+    greedy = np.array([d["greedy"] for d in scored])
+    rand = np.array([d["random"] for d in scored])
+    print(f"Simulated {len(days)} days in {elapsed:.2f}s")
+    print(f"greedy: mean {greedy.mean():.2f}, worst {greedy.max()}, lost {(greedy > MAX_GUESSES).sum()} days")
+    print(f"random: mean {rand.mean():.2f}, worst {rand.max():.2f}")
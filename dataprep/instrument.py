@@ -0,0 +1,153 @@
+import builtins
+import datetime
+import os
+import sys
+import time
+
+from store import open_json, save_json
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def io_counters():
+    """Returns (bytes read, bytes written) by this process so far, (None, None) where unknown."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def peak_rss_kb():
+    """Peak resident memory of this process in KiB, or None where unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class Measure:
+    """Records what a block of work cost, into self.record once the block exits.
+
+    Wall time, time spent waiting on input() prompts, extractor calls and cache
+    hits from ytfetch, bytes read and written, and peak memory. Peak memory is the
+    process high-water mark, so it is only per-stage when each stage gets its own
+    process, as it does under pipeline.py. With `profile` set the block also runs
+    under cProfile and the stats are dumped to that path.
+    """
+
+    def __init__(self, name, profile=None):
+        self.name = name
+        self.profile = profile
+        self.record = None
+        self.prompt_wait = 0.0
+
+    def _timed_input(self, *args):
+        start = time.perf_counter()
+        try:
+            return self._input(*args)
+        finally:
+            self.prompt_wait += time.perf_counter() - start
+
+    def _ytfetch_stats(self):
+        ytfetch = sys.modules.get("ytfetch")
+        return dict(ytfetch.STATS) if ytfetch is not None else {}
+
+    def __enter__(self):
+        self._input = builtins.input
+        builtins.input = self._timed_input
+        self._yt_before = self._ytfetch_stats()
+        self._io_before = io_counters()
+        self._profiler = None
+        if self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile)
+        builtins.input = self._input
+
+        read, written = io_counters()
+        yt_after = self._ytfetch_stats()
+        self.record = {
+            "name": self.name,
+            "wall_s": round(wall, 4),
+            "prompt_wait_s": round(self.prompt_wait, 4),
+            "extract_calls": yt_after.get("extract_calls", 0) - self._yt_before.get("extract_calls", 0),
+            "cache_hits": yt_after.get("cache_hits", 0) - self._yt_before.get("cache_hits", 0),
+            "extract_failures": yt_after.get("failures", 0) - self._yt_before.get("failures", 0),
+            "read_bytes": None if read is None else read - self._io_before[0],
+            "written_bytes": None if written is None else written - self._io_before[1],
+            "peak_rss_kb": peak_rss_kb(),
+        }
+        if self.profile:
+            self.record["profile"] = self.profile
+        return False
+
+
+def run_script(script, argv=(), name=None, profile=None):
+    """Runs a script as __main__ under Measure, returns (exit code, record)."""
+    import runpy
+
+    sys.argv = [script, *argv]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    code = 0
+    with Measure(name or script, profile) as measure:
+        try:
+            runpy.run_path(script, run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            code = 1
+            import traceback
+            traceback.print_exc()
+    measure.record.update(script=script, argv=list(argv), exit_code=code)
+    return code, measure.record
+
+
+def append_record(report, record):
+    """Adds a stage record to a run report file, creating it if needed."""
+    data = open_json(report, None) or {"started": datetime.datetime.now().isoformat(timespec="seconds"), "stages": []}
+    data["stages"].append(record)
+    data["total_wall_s"] = round(sum(stage["wall_s"] for stage in data["stages"]), 4)
+    save_json(report, data)
+
+
+def summary(report):
+    data = open_json(report, {"stages": []})
+    lines = [f"{'stage':<12} {'wall':>8} {'prompts':>8} {'extract':>7} {'read':>10} {'written':>10} {'peak':>9}"]
+    for stage in data["stages"]:
+        kib = lambda n: "?" if n is None else f"{n / 1024:.0f}K"
+        lines.append(
+            f"{stage['name']:<12} {stage['wall_s']:>7.2f}s {stage['prompt_wait_s']:>7.2f}s {stage['extract_calls']:>7} "
+            f"{kib(stage['read_bytes']):>10} {kib(stage['written_bytes']):>10} "
+            f"{'?' if stage['peak_rss_kb'] is None else str(stage['peak_rss_kb'] // 1024) + 'M':>9}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a dataprep script and record what it cost")
+    parser.add_argument("--report", default="run_report.json", help="JSON run report to add this run to")
+    parser.add_argument("--profile", help="also dump cProfile stats to this path")
+    parser.add_argument("--name", help="stage name in the report (default: the script)")
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    code, record = run_script(args.script, args.args, args.name, args.profile)
+    append_record(args.report, record)
+    raise SystemExit(code)
@@ -0,0 +1,113 @@
+import datetime
+import http.client
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dayserver import QUOTES_FILE
+from schedule import Schedule
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(quotes_file, port):
+    """Runs dayserver.py in its own process, so it doesn't share a GIL with the clients."""
+    proc = subprocess.Popen([sys.executable, "dayserver.py", "--quotes", quotes_file, "--port", str(port)],
+                            stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("dayserver.py didn't start")
+
+
+def client(host, port, path, revisit, accept_gzip):
+    """One player loading the page: a fresh connection, a GET, and when revisit a second GET with the ETag.
+
+    Returns [(seconds, status, body bytes)] per request.
+    """
+    headers = {"Accept-Encoding": "gzip"} if accept_gzip else {}
+    results = []
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        for attempt in range(2 if revisit else 1):
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            results.append((time.perf_counter() - start, response.status, len(body)))
+            if response.getheader("ETag"):
+                headers = {**headers, "If-None-Match": response.getheader("ETag")}
+    finally:
+        conn.close()
+    return results
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def burst(host, port, path, clients, concurrency, revisit_every, accept_gzip):
+    """Fires `clients` players at path at once, every revisit_every-th one reloading once."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(client, host, port, path, revisit_every and i % revisit_every == 0, accept_gzip)
+            for i in range(clients)
+        ]
+        requests = [r for f in futures for r in f.result()]
+    wall = time.perf_counter() - start
+    latencies = sorted(r[0] for r in requests)
+    return {
+        "requests": len(requests),
+        "not_modified": sum(1 for r in requests if r[1] == 304),
+        "errors": sum(1 for r in requests if r[1] >= 400),
+        "bytes": sum(r[2] for r in requests),
+        "wall_s": wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate the midnight rush against dayserver.py")
+    parser.add_argument("--quotes", default=QUOTES_FILE)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64, help="clients in flight at once")
+    parser.add_argument("--revisit-every", type=int, default=4, help="every Nth client reloads with If-None-Match")
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--date", help="day to request (default: today UTC, or the first scheduled day)")
+    args = parser.parse_args()
+
+    schedule = Schedule.load(args.quotes)
+    date = args.date or datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+    if date not in schedule:
+        date = schedule.date(0)
+
+    port = free_port()
+    server = start_server(args.quotes, port)
+    try:
+        print(f"{args.clients} clients, {args.concurrency} at a time, gzip {'off' if args.no_gzip else 'on'}")
+        print(f"{'path':<18} {'reqs':>6} {'304s':>5} {'p50':>8} {'p99':>8} {'req/s':>7} {'bytes':>13}")
+        for path in (f"/day/{date}", "/quotes.json"):
+            result = burst("127.0.0.1", port, path, args.clients, args.concurrency, args.revisit_every,
+                           not args.no_gzip)
+            print(f"{path:<18} {result['requests']:>6} {result['not_modified']:>5} {result['p50_ms']:>6.2f}ms "
+                  f"{result['p99_ms']:>6.2f}ms {result['requests'] / result['wall_s']:>7.0f} {result['bytes']:>13,}")
+            if result["errors"]:
+                print(f"  {result['errors']} requests failed")
+    finally:
+        server.terminate()
+        server.wait()
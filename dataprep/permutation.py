@@ -0,0 +1,263 @@
+import datetime
+import json
+from pathlib import Path
+
+from publish import dump_compact, write_published
+from schedule import placeholder
+from scheduler import SEED
+
+# Where the site loads it from, the same file changequotes.py edits whatever the working directory
+SPEC_FILE = Path(__file__).resolve().parent.parent / "public" / "quotes" / "permutation.json"
+SPEC_VERSION = 1
+ROUNDS = 4
+_MASK32 = 0xFFFFFFFF
+
+
+def mix32(x):
+    """murmur3's 32-bit finalizer, which JavaScript can do exactly with Math.imul and >>> 0."""
+    x &= _MASK32
+    x ^= x >> 16
+    x = (x * 0x85EBCA6B) & _MASK32
+    x ^= x >> 13
+    x = (x * 0xC2B2AE35) & _MASK32
+    x ^= x >> 16
+    return x
+
+
+def round_key(key, cycle, r):
+    return mix32(key ^ mix32(cycle ^ mix32(r)))
+
+
+class FeistelPermutation:
+    """A keyed permutation of 0..n-1, one per (key, cycle), computed one index at a time.
+
+    A balanced Feistel network permutes the 2 * half-bit domain, the smallest one
+    with at least n values. It's a bijection there whatever the round function is,
+    since each round can be undone. Indices that land on n or above are pushed through
+    again (cycle walking) until they're back under n, which keeps it a bijection on
+    0..n-1. The domain is less than 4n, so that's a handful of rounds at most on average.
+    """
+
+    def __init__(self, n, key, cycle=0, rounds=ROUNDS):
+        if n < 1:
+            raise ValueError("Can't permute an empty range")
+        self.n = n
+        self.half = max(1, ((n - 1).bit_length() + 1) // 2)
+        self.mask = (1 << self.half) - 1
+        self.keys = [round_key(key, cycle, r) for r in range(rounds)]
+
+    @property
+    def domain(self):
+        return 1 << (2 * self.half)
+
+    def round(self, x, r):
+        left, right = x >> self.half, x & self.mask
+        return (right << self.half) | (left ^ (mix32(right ^ self.keys[r]) & self.mask))
+
+    def encrypt(self, x):
+        for r in range(len(self.keys)):
+            x = self.round(x, r)
+        return x
+
+    def __call__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        x = self.encrypt(i)
+        while x >= self.n:
+            x = self.encrypt(x)
+        return x
+
+
+def check_bijective(n, key, cycles=range(10)):
+    """Checks every Feistel round on its domain and the walked permutation on 0..n-1, for each cycle.
+
+    Returns the number of permutations checked, raises ValueError on the first one that isn't a bijection.
+    """
+    for cycle in cycles:
+        perm = FeistelPermutation(n, key, cycle)
+        for r in range(len(perm.keys)):
+            if len({perm.round(x, r) for x in range(perm.domain)}) != perm.domain:
+                raise ValueError(f"Round {r} of cycle {cycle} isn't a bijection for n={n}")
+        if sorted(perm(i) for i in range(n)) != list(range(n)):
+            raise ValueError(f"Cycle {cycle} isn't a permutation of 0..{n - 1}")
+    return len(cycles)
+
+
+class PermutationSchedule:
+    """Date -> quote without a stored schedule, from a spec small enough to publish.
+
+    From `start` on, day b of the schedule shows quote perm_c(b mod n), with
+    c = b // n: every n days is one full pass over the quotes in a new order, like
+    the rounds of full_shuffle, except there is no last round. When quotes are added
+    a new segment starts with the larger n, so days already shown keep their quote.
+
+    `edits` is the override table. It holds inserts, removes and sets (from swaps)
+    with the same shift-later-days meaning Schedule.apply gives them, and looking up
+    a date walks it backwards to find the base day. It only grows with hand edits
+    from changequotes.py, so it stays short.
+    """
+
+    def __init__(self, spec):
+        if spec.get("version") != SPEC_VERSION:
+            raise ValueError(f"Unsupported permutation spec version: {spec.get('version')}")
+        self.spec = spec
+        self.start = datetime.date.fromisoformat(spec["start"])
+        self._perms = {}
+
+    @classmethod
+    def create(cls, quote_data, start, key=SEED):
+        spec = {
+            "version": SPEC_VERSION,
+            "start": start.isoformat() if isinstance(start, datetime.date) else start,
+            "key": key,
+            "rounds": ROUNDS,
+            "segments": [{"from": 0, "count": len(quote_data)}],
+            "edits": [],
+            "quotes": [],
+        }
+        schedule = cls(spec)
+        schedule.set_quotes(quote_data)
+        return schedule
+
+    @classmethod
+    def load(cls, path=SPEC_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path=SPEC_FILE):
+        write_published(path, dump_compact(self.spec))
+
+    def set_quotes(self, quote_data):
+        """Publishes quote_data, IDs 1..n become quote indices 0..n-1."""
+        ids = sorted(quote_data, key=int)
+        if ids != [str(i) for i in range(1, len(ids) + 1)]:
+            raise ValueError("Quote IDs have to run 1..n without gaps")
+        if len(ids) < self.spec["segments"][-1]["count"]:
+            raise ValueError("Quotes can't be removed from a published permutation, only added")
+        self.spec["quotes"] = [quote_data[quote_id] for quote_id in ids]
+
+    def extend(self, quote_data, from_date):
+        """Takes in added quotes, days from from_date on draw from all of them. Returns how many were added."""
+        added = len(quote_data) - self.spec["segments"][-1]["count"]
+        self.set_quotes(quote_data)
+        if added:
+            day, base = datetime.date.fromisoformat(from_date), None
+            while base is None:  # days held by an override don't have a base day
+                _, base = self._unwind(day)
+                day += datetime.timedelta(days=1)
+            segments = self.spec["segments"]
+            if base <= segments[-1]["from"]:
+                segments[-1]["count"] = len(quote_data)
+            else:
+                segments.append({"from": base, "count": len(quote_data)})
+        return added
+
+    def _unwind(self, day):
+        """Follows day back through the edits, returns (override entry, None) or (None, base day number)."""
+        for edit in reversed(self.spec["edits"]):
+            at = datetime.date.fromisoformat(edit["date"])
+            op = edit["op"]
+            if op in ("set", "insert") and day == at:
+                return edit["quote"], None
+            if op == "insert" and day > at:
+                day -= datetime.timedelta(days=1)
+            elif op == "remove" and day >= at:
+                day += datetime.timedelta(days=1)
+        return None, (day - self.start).days
+
+    def quote_index(self, base):
+        for segment in reversed(self.spec["segments"]):
+            if base >= segment["from"]:
+                break
+        local, n = base - segment["from"], segment["count"]
+        cycle = local // n
+        perm = self._perms.get((n, cycle))
+        if perm is None:
+            perm = self._perms[(n, cycle)] = FeistelPermutation(n, self.spec["key"], cycle, self.spec["rounds"])
+            if len(self._perms) > 64:
+                self._perms.pop(next(iter(self._perms)))
+        return perm(local % n)
+
+    def __getitem__(self, date_str):
+        entry, base = self._unwind(datetime.date.fromisoformat(date_str))
+        if entry is not None:
+            return entry
+        if base < 0:
+            raise KeyError(f"{date_str} is before the permutation starts on {self.spec['start']}")
+        return self.spec["quotes"][self.quote_index(base)]
+
+    def days(self, first, count):
+        """date -> quote for count days from first, for samples and comparisons."""
+        day = datetime.date.fromisoformat(first)
+        result = {}
+        for _ in range(count):
+            result[day.isoformat()] = self[day.isoformat()]
+            day += datetime.timedelta(days=1)
+        return result
+
+    def record(self, inserts=(), removes=(), swaps=(), reservations=()):
+        """Adds a batch of edits to the override table, with the same meaning as Schedule.apply.
+
+        Swaps become sets of the two entries as they are now. The shifting edits go in
+        from the latest date back, so none of them moves a date an earlier one refers to.
+        """
+        for date_str in [*removes, *(d for d, _ in inserts), *(d for s in swaps for d in s), *reservations]:
+            if date_str < self.spec["start"]:
+                raise KeyError(f"{date_str} is before the permutation starts on {self.spec['start']}")
+
+        edits = self.spec["edits"]
+        for a, b in swaps:
+            quote_a, quote_b = self[a], self[b]
+            edits.append({"op": "set", "date": a, "quote": quote_b})
+            edits.append({"op": "set", "date": b, "quote": quote_a})
+
+        by_date = {}
+        for date_str in removes:
+            by_date.setdefault(date_str, ([], []))[0].append(date_str)
+        for date_str, quote in inserts:
+            by_date.setdefault(date_str, ([], []))[1].append(quote)
+        for date_str in reservations:
+            by_date.setdefault(date_str, ([], []))[1].append(placeholder("RESERVED", int(date_str[:4])))
+        for date_str in sorted(by_date, reverse=True):
+            removed, inserted = by_date[date_str]
+            if removed:
+                edits.append({"op": "remove", "date": date_str})
+            for quote in reversed(inserted):
+                edits.append({"op": "insert", "date": date_str, "quote": quote})
+        return self
+
+
+def reference_vectors(n=10, key=SEED, cycles=(0, 1, 7)):
+    """Index -> permuted index for a few cycles, for checking a port against this implementation."""
+    return {cycle: [FeistelPermutation(n, key, cycle)(i) for i in range(n)] for cycle in cycles}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from store import open_json
+
+    parser = argparse.ArgumentParser(description="Check the keyed date -> quote permutation or look days up in it")
+    parser.add_argument("action", choices=["check", "vectors", "show"])
+    parser.add_argument("--quotes", default="quotedata.json")
+    parser.add_argument("--spec", default=SPEC_FILE)
+    parser.add_argument("--cycles", type=int, default=20, help="check: cycles to verify per corpus size")
+    parser.add_argument("--date", help="show: first day (default: the spec's start)")
+    parser.add_argument("--days", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.action == "check":
+        n = len(open_json(args.quotes, {}))
+        start = time.perf_counter()
+        checked = 0
+        for size in sorted({1, 2, 3, 5, 16, 17, n - 1, n, n + 1} - {0}):
+            checked += check_bijective(size, SEED, range(args.cycles))
+        print(f"{checked} permutations and all their rounds are bijections ({time.perf_counter() - start:.1f}s)")
+    elif args.action == "vectors":
+        for cycle, order in reference_vectors().items():
+            print(f"n=10 key={SEED} cycle={cycle}: {order}")
+    else:
+        schedule = PermutationSchedule.load(args.spec)
+        for date_str, quote in schedule.days(args.date or schedule.spec["start"], args.days).items():
+            print(f"{date_str}  {quote.get('game') or quote.get('title')}: {quote['quote'][:80]}")
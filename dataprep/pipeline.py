@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import sheets
+from store import SELECTED_IDS_ENV, file_hash, open_json, save_json
+
+STATE_FILE = "pipeline_state.json"
+
+Stage = namedtuple("Stage", ["name", "script", "inputs", "outputs", "per_quote"])
+
+STAGES = [
+    Stage("start", "1.startdata.py", ["quotestodo.tsv"], ["quotedata.json", "quotestodo_rows.json"], True),
+    Stage("fetch", "2.fillyoutube.py", ["quotedata.json"], ["quotedata.json"], True),
+    Stage("stream", "3.fillstream.py", ["quotedata.json", "quotestodo.tsv", "title_map.json", "streamdata.tsv"],
+          ["quotedata.json", "title_map.json"], True),
+    Stage("years", "4.years.py", ["quotedata.json", "title_map.json", "streamdata.tsv"],
+          ["quotedata.json", "title_map.json"], True),
+    Stage("game", "5.game.py", ["quotedata.json"], ["quotedata.json"], True),
+    Stage("shuffle", "6.shuffle.py", ["quotedata.json"], ["quotes.json", "quotes_sample.json"], False),
+]
+
+
+def row_hashes(path="quotestodo.tsv"):
+    """Returns quote_id -> hash of its quotestodo.tsv row."""
+    return {row.quote_id: row.row_hash for row in sheets.quotes(path)}
+
+
+def tracked_files():
+    files = {}
+    for stage in STAGES:
+        for path in (stage.script, *stage.inputs, *stage.outputs):
+            files[path] = None
+    return list(files)
+
+
+def plan(state, force=False):
+    """Returns the files that changed since the last successful run."""
+    recorded = state.get("files", {})
+    if force:
+        return set(tracked_files())
+    return {path for path in tracked_files() if file_hash(path) != recorded.get(path)}
+
+
+def changed_quote_ids(state, rows):
+    previous = state.get("rows", {})
+    return sorted((qid for qid, h in rows.items() if previous.get(qid) != h), key=lambda qid: (len(qid), qid))
+
+
+def run(force=False, stop_after=None, report=None, profile=()):
+    """Runs the stages whose script or inputs changed since the last successful run.
+
+    Files are fingerprinted by content hash, so a stage that rewrites its output with
+    the same bytes doesn't wake up the stages after it. When quotestodo.tsv is the
+    only external input that changed, the per-quote stages get the IDs of the rows
+    that changed in JOEDLE_QUOTE_IDS and leave every other quote alone.
+
+    With `report` set each stage runs under instrument.py and its timings land in
+    that file, stages named in `profile` also dump cProfile stats to <stage>.prof.
+    """
+    state = open_json(STATE_FILE, {})
+    dirty = plan(state, force)
+    rows = row_hashes()
+
+    env = dict(os.environ)
+    if not force and state and dirty <= {"quotestodo.tsv"}:
+        env[SELECTED_IDS_ENV] = ",".join(changed_quote_ids(state, rows))
+        print(f"Changed quotes: {env[SELECTED_IDS_ENV] or 'none'}")
+
+    if report and Path(report).exists():
+        os.remove(report)
+
+    ran = []
+    for stage in STAGES:
+        missing = [path for path in stage.outputs if not Path(path).exists()]
+        triggers = [path for path in (stage.script, *stage.inputs) if path in dirty]
+        if not triggers and not missing:
+            print(f"[{stage.name}] up to date")
+        else:
+            print(f"[{stage.name}] running {stage.script} ({', '.join(triggers + missing)} changed)")
+            before = {path: file_hash(path) for path in stage.outputs}
+            stage_env = env if stage.per_quote else {k: v for k, v in env.items() if k != SELECTED_IDS_ENV}
+            command = [sys.executable, stage.script]
+            if report:
+                options = ["--report", report, "--name", stage.name]
+                if stage.name in profile:
+                    options += ["--profile", f"{stage.name}.prof"]
+                command = [sys.executable, "instrument.py", *options, stage.script]
+            result = subprocess.run(command, env=stage_env)
+            if result.returncode != 0:
+                print(f"[{stage.name}] failed with exit code {result.returncode}, state not saved")
+                return ran
+            ran.append(stage.name)
+            dirty |= {path for path in stage.outputs if file_hash(path) != before[path]}
+        if stop_after == stage.name:
+            break
+    else:
+        save_json(STATE_FILE, {"files": {path: file_hash(path) for path in tracked_files()}, "rows": rows})
+    return ran
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the dataprep stages whose inputs changed")
+    parser.add_argument("--force", action="store_true", help="run every stage on every quote")
+    parser.add_argument("--stop-after", choices=[stage.name for stage in STAGES])
+    parser.add_argument("--dry-run", action="store_true", help="only list the changed files")
+    parser.add_argument("--report", help="record per-stage timings, I/O and memory to this JSON file")
+    parser.add_argument("--profile", action="append", default=[], choices=[stage.name for stage in STAGES],
+                        help="with --report, also dump cProfile stats for this stage to <stage>.prof")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        for path in sorted(plan(open_json(STATE_FILE, {}), args.force)):
+            print(path)
+    else:
+        run(args.force, args.stop_after, args.report, args.profile)
+        if args.report and Path(args.report).exists():
+            from instrument import summary
+            print(summary(args.report))
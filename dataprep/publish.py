@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from catalog import build_catalog
+
+try:
+    import brotli
+except ImportError:  # Optional, without it only .gz variants are written
+    brotli = None
+
+MANIFEST = "manifest.json"
+# Every precompressed variant a published file can have, whether or not it can be written here
+VARIANTS = (".gz", ".br")
+
+_SHARD_RE = re.compile(r"^(\d{4}-\d{2}(-\d{2})?|catalog)\.[0-9a-f]+\.json(\.gz|\.br)?$")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def shard_key(date_str, granularity="month"):
+    return date_str if granularity == "day" else date_str[:7]
+
+
+def dump_compact(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _compressors():
+    """suffix -> (compress, decompress) for each variant this install can write."""
+    # mtime=0 keeps the gzip header, and so the file, identical across runs
+    compressors = {".gz": (lambda data: gzip.compress(data, 9, mtime=0), gzip.decompress)}
+    if brotli is not None:
+        compressors[".br"] = (lambda data: brotli.compress(data, quality=11), brotli.decompress)
+    return compressors
+
+
+COMPRESSORS = _compressors()
+
+
+def compressed_variants(data):
+    """Returns {suffix: bytes} of the precompressed copies a static host can serve as is."""
+    return {suffix: compress(data) for suffix, (compress, _) in COMPRESSORS.items()}
+
+
+def _replace(path, data):
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _holds(variant, decompress, data):
+    try:
+        return decompress(variant.read_bytes()) == data
+    except Exception:  # missing, truncated or not that format at all
+        return False
+
+
+def write_published(path, data, overwrite=True):
+    """Writes data to path plus its .gz/.br variants, skipping files already in place when not overwrite.
+
+    A variant is only compressed again when it doesn't decompress to data, brotli at
+    quality 11 is by far the slowest part of publishing and most files are unchanged
+    from the last run. Variants this install can't write (.br without brotli) are
+    deleted, a host would otherwise keep serving the old content from them.
+    """
+    path = Path(path)
+    if overwrite and path.exists() and path.read_bytes() == data:
+        overwrite = False
+    if overwrite or not path.exists():
+        _replace(path, data)
+    for suffix in VARIANTS:
+        variant = path.with_name(path.name + suffix)
+        if suffix not in COMPRESSORS:
+            variant.unlink(missing_ok=True)
+            continue
+        compress, decompress = COMPRESSORS[suffix]
+        if not _holds(variant, decompress, data):
+            _replace(variant, compress(data))
+
+
+def _write_addressed(out, key, data):
+    name = f"{key}.{content_hash(data)}.json"
+    # The name is the hash of the content, an existing file is already right
+    write_published(out / name, data, overwrite=False)
+    return name
+
+
+def write_shards(quotes, out_dir, granularity="month"):
+    """Splits a date -> quote schedule into content-addressed shard files plus a manifest.
+
+    Each shard holds one day or one month of the schedule and is named
+    `<key>.<hash>.json`, so a shard's URL changes exactly when its content does and
+    the host can cache it forever. manifest.json maps each key to its current shard
+    file and is the only file clients need to revalidate. Shards no longer referenced
+    by the manifest are deleted. The guess catalog is published the same way, so a
+    client needs the manifest, today's shard and the catalog. Returns the manifest.
+    """
+    if granularity not in ("day", "month"):
+        raise ValueError(f"Unknown shard granularity: {granularity}")
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    groups = {}
+    for date_str, quote in quotes.items():
+        groups.setdefault(shard_key(date_str, granularity), {})[date_str] = quote
+
+    shards = {key: _write_addressed(out, key, dump_compact(groups[key])) for key in sorted(groups)}
+    catalog = _write_addressed(out, "catalog", dump_compact(build_catalog(quotes)))
+
+    manifest = {"granularity": granularity, "catalog": catalog, "shards": shards}
+    write_published(out / MANIFEST, dump_compact(manifest))
+
+    live = {catalog, *shards.values()}
+    for path in out.iterdir():
+        match = _SHARD_RE.match(path.name)
+        if match and path.name.removesuffix(match.group(3) or "") not in live:
+            path.unlink()
+
+    return manifest
+
+
+def size_report(out_dir):
+    """Returns [(file, bytes, gzip bytes, brotli bytes or None)] for everything the manifest publishes."""
+    out = Path(out_dir)
+    manifest = json.loads((out / MANIFEST).read_bytes())
+    rows = []
+    for name in [MANIFEST, manifest["catalog"], *manifest["shards"].values()]:
+        sizes = [(out / (name + suffix)) for suffix in ("", ".gz", ".br")]
+        rows.append((name, *(p.stat().st_size if p.exists() else None for p in sizes)))
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report raw and compressed sizes of the published files")
+    parser.add_argument("out_dir", nargs="?", default="../public/quotes")
+    args = parser.parse_args()
+
+    rows = size_report(args.out_dir)
+    fmt = lambda n: "-" if n is None else f"{n:,}"
+    print(f"{'file':<28} {'json':>9} {'gzip':>9} {'brotli':>9}")
+    for name, raw, gz, br in rows:
+        print(f"{name:<28} {fmt(raw):>9} {fmt(gz):>9} {fmt(br):>9}")
+    totals = [sum(r[i] or 0 for r in rows) for i in (1, 2, 3)]
+    print(f"{'total':<28} {fmt(totals[0]):>9} {fmt(totals[1]):>9} {fmt(totals[2] if brotli else None):>9}")
@@ -0,0 +1,126 @@
+import datetime
+import json
+from collections import defaultdict
+
+
+def placeholder(kind="RESERVED", year=None):
+    """A day without a real quote, the client shows a message for RESERVED and NOQUOTE."""
+    return {
+        "quote": kind,
+        "title": "RESERVED",
+        "url": "https://example.com/video",
+        "year": year,
+        "type": "Stream",
+        "game": "Example Game",
+    }
+
+
+class Schedule:
+    """A start date plus the ordered list of daily quotes, day i being start + i days.
+
+    Dates are never stored, so shifting every later day after an insert or removal is
+    just a change of list position.
+    """
+
+    def __init__(self, start, entries):
+        if isinstance(start, str):
+            start = datetime.date.fromisoformat(start)
+        self.start = start
+        self.entries = list(entries)
+
+    @classmethod
+    def from_dict(cls, quotes):
+        dates = list(quotes)
+        if not dates:
+            raise ValueError("Empty schedule has no start date")
+        start = datetime.date.fromisoformat(dates[0])
+        for i, date_str in enumerate(dates):
+            expected = (start + datetime.timedelta(days=i)).isoformat()
+            if date_str != expected:
+                raise ValueError(f"Schedule is not contiguous: expected {expected}, found {date_str}")
+        return cls(start, quotes.values())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, date_str):
+        return 0 <= self._offset(date_str) < len(self.entries)
+
+    def __getitem__(self, date_str):
+        i = self._offset(date_str)
+        if not 0 <= i < len(self.entries):
+            raise KeyError(date_str)
+        return self.entries[i]
+
+    def _offset(self, date_str):
+        return (datetime.date.fromisoformat(date_str) - self.start).days
+
+    def date(self, i):
+        return (self.start + datetime.timedelta(days=i)).isoformat()
+
+    def dates(self):
+        day = self.start
+        one = datetime.timedelta(days=1)
+        for _ in self.entries:
+            yield day.isoformat()
+            day += one
+
+    def items(self):
+        return zip(self.dates(), self.entries)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def apply(self, inserts=(), removes=(), swaps=(), reservations=()):
+        """Applies a batch of edits in one pass over the schedule.
+
+        Every date in the batch refers to the schedule as it was before the batch, so the
+        result doesn't depend on the order edits are listed in:
+
+        - inserts: (date, quote) pairs, the quote takes that date and the old entry and
+          everything after it move a day later. Several inserts on one date keep their order.
+        - removes: dates to drop, everything after moves a day earlier.
+        - swaps: (date, date) pairs whose entries trade places.
+        - reservations: dates that get a RESERVED placeholder inserted.
+        """
+        n = len(self.entries)
+
+        def offset(date_str, allow_end=False):
+            i = self._offset(date_str)
+            if not 0 <= i < n + allow_end:
+                raise KeyError(f"{date_str} is outside the schedule ({self.date(0)} to {self.date(n - 1)})")
+            return i
+
+        entries = self.entries
+        if swaps:
+            entries = list(entries)
+            for a, b in swaps:
+                i, j = offset(a), offset(b)
+                entries[i], entries[j] = entries[j], entries[i]
+
+        before = defaultdict(list)
+        for date_str, quote in inserts:
+            before[offset(date_str, allow_end=True)].append(quote)
+        for date_str in reservations:
+            i = offset(date_str, allow_end=True)
+            before[i].append(placeholder("RESERVED", int(self.date(i)[:4])))
+        removed = {offset(date_str) for date_str in removes}
+
+        if not before and not removed:
+            self.entries = entries
+            return self
+
+        result = []
+        for i, entry in enumerate(entries):
+            if i in before:
+                result.extend(before[i])
+            if i not in removed:
+                result.append(entry)
+        result.extend(before.get(n, ()))
+        self.entries = result
+        return self
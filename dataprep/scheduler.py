@@ -0,0 +1,161 @@
+import datetime
+import heapq
+import math
+import random
+
+SEED = 11037
+
+
+def quote_key(quote):
+    return quote.get("quote"), quote.get("url")
+
+
+def find_new_quotes(quote_data, scheduled_ids=None, schedule=None):
+    """Returns {quote_id: quote} for quotes in quote_data that aren't scheduled yet.
+
+    With the scheduled IDs from a previous run this only looks at quote_data. Without
+    them every scheduled entry is matched against quote_data by quote text and URL.
+    """
+    if scheduled_ids is not None:
+        scheduled = set(scheduled_ids)
+        return {qid: q for qid, q in quote_data.items() if qid not in scheduled}
+    seen = {quote_key(q) for q in schedule.entries}
+    return {qid: q for qid, q in quote_data.items() if quote_key(q) not in seen}
+
+
+def frozen_length(schedule, freeze_until):
+    """Number of leading days on or before freeze_until, which must never change."""
+    if isinstance(freeze_until, str):
+        freeze_until = datetime.date.fromisoformat(freeze_until)
+    return max(0, min(len(schedule), (freeze_until - schedule.start).days + 1))
+
+
+def extend_schedule(schedule, new_quotes, freeze_until, corpus_size, seed=SEED):
+    """Slots new quotes into the unpublished tail of a schedule, in place.
+
+    Days up to and including freeze_until are never touched. The tail after them is
+    cut into `copies` equal segments, copies being how many times an existing quote
+    shows up in the tail on average, and each new quote is inserted once per segment
+    at a position drawn from an RNG seeded by (seed, quote ID, segment). Placement is
+    therefore deterministic and independent of the other new quotes, and the cost is
+    one list insert per copy, not a reshuffle. Returns the number of days added.
+    """
+    frozen = frozen_length(schedule, freeze_until)
+    tail = len(schedule) - frozen
+    copies = max(1, round(tail / corpus_size)) if corpus_size else 1
+
+    inserts = []
+    for qid, quote in new_quotes.items():
+        for segment in range(copies):
+            rng = random.Random(f"{seed}:{qid}:{segment}")
+            lo = tail * segment // copies
+            hi = tail * (segment + 1) // copies
+            inserts.append((frozen + rng.randint(lo, hi), qid, quote))
+
+    # Insert back to front so earlier positions still refer to the original tail
+    inserts.sort(key=lambda x: (x[0], x[1]), reverse=True)
+    for position, _, quote in inserts:
+        schedule.entries.insert(position, quote)
+    return len(inserts)
+
+
+def full_shuffle(quote_data, rounds=10, seed=SEED):
+    """The original schedule: `rounds` shuffles of quote IDs 1..n back to back.
+
+    Uses its own RNG seeded the same way random.seed(seed) would, so the order matches
+    the one 6.shuffle.py has always produced.
+    """
+    rng = random.Random(seed)
+    order = [str(i) for i in range(1, len(quote_data) + 1)]
+    result = []
+    for _ in range(rounds):
+        rng.shuffle(order)
+        result.extend(order)
+    return result
+
+
+def _week_quotas(quote_data, slack):
+    counts = {}
+    for quote in quote_data.values():
+        counts[quote.get("type")] = counts.get(quote.get("type"), 0) + 1
+    total = sum(counts.values())
+    return {t: math.ceil(7 * c / total) + slack for t, c in counts.items()}
+
+
+def generate_schedule(quote_data, rounds=10, quote_gap=None, game_gap=14, title_gap=14, week_slack=0, seed=SEED):
+    """Builds a schedule of quote IDs that spaces out repeats, as a list with one ID per day.
+
+    Every quote is placed `rounds` times. On each day the scheduler picks, among
+    quotes that are allowed on that day, the one used the fewest times so far with
+    random tie-breaking, which keeps rounds roughly intact. A quote is allowed when:
+
+    - its last use is at least quote_gap days back (default: half the corpus),
+    - no quote with the same game is within game_gap days, nor with the same title
+      within title_gap days,
+    - its type hasn't used up its share of the current week, 7 days times the type's
+      share of the corpus rounded up, plus week_slack.
+
+    Candidates live in two heaps, quotes that may be allowed today and quotes parked
+    until the day their blocking constraint lifts. A candidate popped from the first
+    heap that turns out to be blocked is parked until exactly that day rather than
+    retried, so each placement costs O(log n) amortized. If every candidate is
+    parked, the earliest one is used anyway and counted as relaxed. Returns
+    (order, stats).
+    """
+    ids = sorted(quote_data, key=lambda qid: (len(qid), qid))
+    if quote_gap is None:
+        quote_gap = len(ids) // 2
+    quotas = _week_quotas(quote_data, week_slack)
+    rng = random.Random(seed)
+
+    used = dict.fromkeys(ids, 0)
+    last_game = {}
+    last_title = {}
+    week_counts = {}
+    ready = [(0, rng.random(), qid) for qid in ids]
+    heapq.heapify(ready)
+    parked = []  # (day the blocking constraint lifts, uses, tiebreak, qid)
+
+    order = []
+    relaxed = 0
+    total = len(ids) * rounds
+    for day in range(total):
+        week = day // 7
+        while parked and parked[0][0] <= day:
+            _, uses, tiebreak, qid = heapq.heappop(parked)
+            heapq.heappush(ready, (uses, tiebreak, qid))
+
+        pick = None
+        while ready:
+            uses, tiebreak, qid = heapq.heappop(ready)
+            quote = quote_data[qid]
+            game, title, kind = quote.get("game"), quote.get("title"), quote.get("type")
+            lift = day
+            if game is not None and game in last_game:
+                lift = max(lift, last_game[game] + game_gap)
+            if title is not None and title in last_title:
+                lift = max(lift, last_title[title] + title_gap)
+            if week_counts.get((week, kind), 0) >= quotas[kind]:
+                lift = max(lift, (week + 1) * 7)
+            if lift > day:
+                heapq.heappush(parked, (lift, uses, tiebreak, qid))
+                continue
+            pick = qid
+            break
+
+        if pick is None:
+            _, uses, tiebreak, pick = heapq.heappop(parked)
+            relaxed += 1
+
+        quote = quote_data[pick]
+        order.append(pick)
+        used[pick] += 1
+        if quote.get("game") is not None:
+            last_game[quote["game"]] = day
+        if quote.get("title") is not None:
+            last_title[quote["title"]] = day
+        week_counts[(week, quote.get("type"))] = week_counts.get((week, quote.get("type")), 0) + 1
+        if used[pick] < rounds:
+            heapq.heappush(parked, (day + quote_gap, used[pick], rng.random(), pick))
+
+    return order, {"days": len(order), "relaxed": relaxed}
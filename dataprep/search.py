@@ -0,0 +1,246 @@
+import bisect
+import hashlib
+import json
+import math
+import re
+from collections import defaultdict
+
+from store import open_json, save_json
+from titlematch import normalize
+
+INDEX_FILE = "search_index.json"
+INDEX_VERSION = 1
+FIELDS = ("quote", "title", "game")
+# A hit in the title or game says more about what a quote is about than one in passing
+WEIGHTS = {"quote": 1.0, "title": 2.0, "game": 2.0}
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    return normalize(text or "").split()
+
+
+def fingerprint(quote):
+    data = json.dumps([quote.get(field) or "" for field in FIELDS], ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def parse_query(query):
+    """Splits a query into (terms, phrases, prefixes).
+
+    "quoted words" are a phrase, a word ending in * a prefix, everything else a term.
+    Every part has to match for a quote to be a result.
+    """
+    terms, phrases, prefixes = [], [], []
+    for phrase, word in _QUERY_RE.findall(query):
+        if phrase:
+            words = tokenize(phrase)
+            if len(words) > 1:
+                phrases.append(words)
+            else:
+                terms.extend(words)
+        elif word.endswith("*") and tokenize(word):
+            prefixes.append(tokenize(word)[0])
+        else:
+            terms.extend(tokenize(word))
+    return terms, phrases, prefixes
+
+
+class SearchIndex:
+    """Positional inverted index over the quote, title and game of every quote.
+
+    postings maps term -> quote ID -> field -> word positions. Each indexed quote
+    keeps a fingerprint of its fields, so update() only retokenizes the quotes that
+    are new or changed and drops the ones that are gone.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.docs = {}  # quote ID -> {"hash", "lengths": {field: words}, "terms"}
+        self._terms = None  # sorted postings keys, for prefix lookups
+        self._averages = None  # average words per field
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls()
+        data = open_json(path, None)
+        if data and data.get("version") == INDEX_VERSION:
+            index.postings.update(data["postings"])
+            index.docs = data["docs"]
+        return index
+
+    def save(self, path=INDEX_FILE):
+        save_json(path, {"version": INDEX_VERSION, "docs": self.docs, "postings": self.postings})
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, quote_id, quote):
+        if quote_id in self.docs:
+            self.remove(quote_id)
+        lengths = {}
+        terms = set()
+        for field in FIELDS:
+            words = tokenize(quote.get(field))
+            lengths[field] = len(words)
+            for pos, word in enumerate(words):
+                self.postings[word].setdefault(quote_id, {}).setdefault(field, []).append(pos)
+                terms.add(word)
+        self.docs[quote_id] = {"hash": fingerprint(quote), "lengths": lengths, "terms": sorted(terms)}
+        self._terms = self._averages = None
+
+    def remove(self, quote_id):
+        doc = self.docs.pop(quote_id, None)
+        if doc is None:
+            return
+        for term in doc["terms"]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(quote_id, None)
+                if not postings:
+                    del self.postings[term]
+        self._terms = self._averages = None
+
+    def update(self, quote_data):
+        """Brings the index in line with quote_data, returns (added or changed, removed) counts."""
+        removed = [quote_id for quote_id in self.docs if quote_id not in quote_data]
+        for quote_id in removed:
+            self.remove(quote_id)
+        changed = 0
+        for quote_id, quote in quote_data.items():
+            doc = self.docs.get(quote_id)
+            if doc is None or doc["hash"] != fingerprint(quote):
+                self.add(quote_id, quote)
+                changed += 1
+        return changed, len(removed)
+
+    def expand(self, prefix):
+        """Every indexed term starting with prefix."""
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        i = bisect.bisect_left(self._terms, prefix)
+        found = []
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            found.append(self._terms[i])
+            i += 1
+        return found
+
+    def _phrase_fields(self, quote_id, words):
+        """Fields of quote_id in which words appear consecutively."""
+        fields = []
+        first = self.postings[words[0]][quote_id]
+        for field, positions in first.items():
+            rest = [set(self.postings[w][quote_id].get(field, ())) for w in words[1:]]
+            if any(all(pos + i + 1 in r for i, r in enumerate(rest)) for pos in positions):
+                fields.append(field)
+        return fields
+
+    def _score(self, term, quote_id, fields=None):
+        """BM25 for one term in one quote, summed over its fields with WEIGHTS."""
+        postings = self.postings[term]
+        idf = math.log(1 + (len(self.docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+        lengths = self.docs[quote_id]["lengths"]
+        score = 0.0
+        for field, positions in postings[quote_id].items():
+            if fields is not None and field not in fields:
+                continue
+            average = self._average_length(field)
+            tf = len(positions)
+            norm = tf + K1 * (1 - B + B * lengths[field] / average) if average else tf + K1
+            score += WEIGHTS[field] * idf * tf * (K1 + 1) / norm
+        return score
+
+    def _average_length(self, field):
+        if self._averages is None:
+            self._averages = {
+                f: sum(doc["lengths"][f] for doc in self.docs.values()) / max(1, len(self.docs)) for f in FIELDS
+            }
+        return self._averages[field]
+
+    def search(self, query, limit=10):
+        """Returns up to limit (score, quote ID) pairs for query, best first."""
+        terms, phrases, prefixes = parse_query(query)
+        if not (terms or phrases or prefixes):
+            return []
+
+        # Each part narrows the candidates down, rarest terms first so the sets stay small
+        required = sorted({*terms, *(w for p in phrases for w in p)}, key=lambda t: len(self.postings.get(t, ())))
+        candidates = None
+        for term in required:
+            ids = self.postings.get(term, {}).keys()
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        expanded = []
+        for prefix in prefixes:
+            matches = self.expand(prefix)
+            ids = set().union(*(self.postings[t].keys() for t in matches)) if matches else set()
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+            expanded.append(matches)
+
+        scores = {}
+        for quote_id in candidates:
+            score = sum(self._score(term, quote_id) for term in terms)
+            for words in phrases:
+                fields = self._phrase_fields(quote_id, words)
+                if not fields:
+                    break
+                score += sum(self._score(w, quote_id, fields) for w in words)
+            else:
+                for matches in expanded:
+                    score += max(self._score(t, quote_id) for t in matches if quote_id in self.postings[t])
+                scores[quote_id] = score
+        return sorted(((s, q) for q, s in scores.items()), key=lambda r: (-r[0], int(r[1])))[:limit]
+
+
+def update_index(quote_data, path=INDEX_FILE):
+    """Loads the index at path, updates it from quote_data and saves it if anything changed."""
+    index = SearchIndex.load(path)
+    changed, removed = index.update(quote_data)
+    if changed or removed:
+        index.save(path)
+    return index, changed, removed
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Search quotes by quote text, title and game: terms, "a phrase" and prefix* all have to match'
+    )
+    parser.add_argument("query", nargs="*")
+    parser.add_argument("--quotes", default="quotedata.json")
+    parser.add_argument("--index", default=INDEX_FILE)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rebuild", action="store_true", help="build the index from scratch")
+    args = parser.parse_args()
+
+    quote_data = open_json(args.quotes, {})
+    start = time.perf_counter()
+    if args.rebuild:
+        index = SearchIndex()
+        index.update(quote_data)
+        index.save(args.index)
+        changed, removed = len(index), 0
+    else:
+        index, changed, removed = update_index(quote_data, args.index)
+    if changed or removed:
+        print(f"Indexed {changed} quotes, dropped {removed} in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    if args.query:
+        query = " ".join(args.query)
+        start = time.perf_counter()
+        results = index.search(query, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for score, quote_id in results:
+            quote = quote_data[quote_id]
+            text = quote["quote"] if len(quote["quote"]) <= 100 else quote["quote"][:97] + "..."
+            print(f"{quote_id:>5} {score:6.2f}  {quote.get('game') or quote.get('title')}: {text}")
+        print(f"{len(results)} results for {query!r} in {elapsed:.1f}ms")
@@ -0,0 +1,128 @@
+import csv
+import datetime
+import hashlib
+import os
+import pickle
+from collections import namedtuple
+
+from store import file_hash
+from ytfetch import timestamp, video_id
+
+# Bump when a record layout changes, so stale caches get reparsed
+CACHE_VERSION = 2
+
+# row_hash is a short hash of the row's cells as written, to tell which rows were edited
+QuoteRow = namedtuple("QuoteRow", ["quote_id", "quote", "title", "url", "year", "type", "video_id", "start", "row_hash"])
+# sources holds a (video ID, t= offset) pair per YouTube link in the src columns
+StreamRow = namedtuple("StreamRow", ["date", "game", "stream_nr", "year", "sources"])
+VideoRow = namedtuple("VideoRow", ["type", "date", "game", "year"])
+
+
+def parse_date(value):
+    """Parses the sheets' 'Mon, 10/02/2017' dates, None when blank or malformed."""
+    try:
+        return datetime.datetime.strptime(value.strip()[-10:], "%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+
+def _rows(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter="\t")
+        next(reader)  # Skip header
+        yield from reader
+
+
+def row_hash(cells):
+    return hashlib.sha256("\t".join(cells).encode("utf-8")).hexdigest()[:16]
+
+
+def iter_quotes(path="quotestodo.tsv"):
+    for cells in _rows(path):
+        quote_id, quote, title, url, year, kind = cells
+        year = int(year) if year.strip().isdigit() else None
+        yield QuoteRow(quote_id, quote, title, url, year, kind, video_id(url), timestamp(url), row_hash(cells))
+
+
+def iter_streams(path="streamdata.tsv"):
+    date = None
+    for row in _rows(path):
+        # Rows with a blank date are more games from the previous day
+        date = parse_date(row[0]) or date
+        sources = []
+        for src in row[3:6]:
+            vid = video_id(src)
+            if vid is not None:
+                sources.append((vid, timestamp(src)))
+        yield StreamRow(date, row[1], row[2], date.year if date else None, tuple(sources))
+
+
+def iter_videos(path="joevideotypes.tsv"):
+    kind = None
+    date = None
+    for row in _rows(path):
+        # Blank type and date cells repeat the row above
+        kind = row[0] or kind
+        date = parse_date(row[1]) or date
+        yield VideoRow(kind, date, row[2], date.year if date else None)
+
+
+def _cached(path, parse):
+    """Returns list(parse(path)), reusing `<path>.cache` while the source is unchanged.
+
+    The cache is keyed by mtime and size, which costs one stat. When those moved but
+    the content hash still matches, as after a checkout, the key is refreshed
+    without reparsing.
+    """
+    cache_path = f"{path}.cache"
+    st = os.stat(path)
+    cache = None
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+        if cache["version"] != CACHE_VERSION or cache["parser"] != parse.__name__:
+            cache = None
+    except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError, AttributeError):
+        cache = None
+
+    if cache is not None and (cache["mtime_ns"], cache["size"]) == (st.st_mtime_ns, st.st_size):
+        return cache["rows"]
+    digest = file_hash(path)
+    if cache is None or cache["sha256"] != digest:
+        cache = {"version": CACHE_VERSION, "parser": parse.__name__, "sha256": digest, "rows": list(parse(path))}
+    cache["mtime_ns"], cache["size"] = st.st_mtime_ns, st.st_size
+
+    tmp = f"{cache_path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache_path)
+    return cache["rows"]
+
+
+def quotes(path="quotestodo.tsv"):
+    return _cached(path, iter_quotes)
+
+
+def streams(path="streamdata.tsv"):
+    return _cached(path, iter_streams)
+
+
+def videos(path="joevideotypes.tsv"):
+    return _cached(path, iter_videos)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Through the module, so the cached records pickle as sheets.QuoteRow and not __main__.QuoteRow
+    import sheets
+
+    for load, parse in ((sheets.quotes, iter_quotes), (sheets.streams, iter_streams), (sheets.videos, iter_videos)):
+        start = time.perf_counter()
+        rows = list(parse())
+        parsed = time.perf_counter() - start
+        load()
+        start = time.perf_counter()
+        assert load() == rows
+        cached = time.perf_counter() - start
+        print(f"{parse.__name__}: {len(rows)} rows, parse {parsed * 1000:.1f} ms, cached {cached * 1000:.1f} ms")
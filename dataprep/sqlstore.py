@@ -0,0 +1,163 @@
+import json
+import sqlite3
+from pathlib import Path
+
+from store import file_hash, save_json
+from ytfetch import video_id
+
+COLUMNS = ("quote", "title", "url", "year", "type", "game")
+# Fields items() can filter on, each backed by an index
+INDEXED = ("type", "game", "title", "year", "video_id")
+
+# Value columns have no declared type, so SQLite stores exactly what it's given and a
+# year that's still the string "2016" doesn't silently become an int
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    quote, title, url, year, type, game,
+    video_id TEXT,
+    keys TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS quotes_seq ON quotes (seq);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+""" + "".join(f"CREATE INDEX IF NOT EXISTS quotes_{c} ON quotes ({c});\n" for c in INDEXED)
+
+
+class SqliteQuoteStore:
+    """QuoteStore backed by an indexed SQLite copy of quotedata.json.
+
+    Each update() is its own transaction, so an interrupted stage keeps what it did
+    without rewriting the JSON file. items() filters in SQL, so a stage can ask for
+    the stream quotes without a year instead of looping over everything. JSON stays
+    the format the other stages and git see: the database is reimported whenever
+    quotedata.json changed since it was last synced, and a clean exit from the
+    `with` block exports it back, like QuoteStore.compact().
+    """
+
+    def __init__(self, path="quotedata.json", only=None, db_path=None):
+        self.path = path
+        self.only = only
+        self.db_path = db_path or str(Path(path).with_suffix(".sqlite"))
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        synced = self.conn.execute("SELECT value FROM meta WHERE key = 'json_sha256'").fetchone()
+        current = file_hash(path)
+        if current is not None and (synced is None or synced["value"] != current):
+            self.import_json(path)
+
+    def _quote(self, row):
+        values = {c: row[c] for c in COLUMNS}
+        values.update(json.loads(row["extra"]) if row["extra"] else {})
+        return {k: values.get(k) for k in json.loads(row["keys"])}
+
+    def _write(self, quote_id, quote, seq):
+        extra = {k: v for k, v in quote.items() if k not in COLUMNS}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO quotes (id, seq, quote, title, url, year, type, game, video_id, keys, extra)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (quote_id, seq, *(quote.get(c) for c in COLUMNS), video_id(quote.get("url") or ""),
+             json.dumps(list(quote)), json.dumps(extra, ensure_ascii=False) if extra else None),
+        )
+
+    def _sync_hash(self, path):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('json_sha256', ?)", (file_hash(path),))
+
+    def import_json(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self.conn:
+            self.conn.execute("DELETE FROM quotes")
+            for seq, (quote_id, quote) in enumerate(data.items()):
+                self._write(quote_id, quote, seq)
+            self._sync_hash(path)
+        return len(data)
+
+    def export_json(self, path):
+        data = {row["id"]: self._quote(row) for row in self.conn.execute("SELECT * FROM quotes ORDER BY seq")}
+        save_json(path, data)
+        with self.conn:
+            self._sync_hash(path)
+        return len(data)
+
+    def __contains__(self, quote_id):
+        return self.conn.execute("SELECT 1 FROM quotes WHERE id = ?", (quote_id,)).fetchone() is not None
+
+    def __getitem__(self, quote_id):
+        row = self.conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+        if row is None:
+            raise KeyError(quote_id)
+        return self._quote(row)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def items(self, missing=None, **equals):
+        """Same filters as QuoteStore.items(), answered from the indexes."""
+        where, params = [], []
+        for field in ([missing] if missing else []) + list(equals):
+            if field not in COLUMNS and field != "video_id":
+                raise KeyError(f"Can't filter on {field}")
+        if missing:
+            where.append(f"({missing} IS NULL OR {missing} = '')")
+        for field, value in equals.items():
+            where.append(f"{field} IS ?")
+            params.append(value)
+        sql = "SELECT * FROM quotes" + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY seq"
+        return [
+            (row["id"], self._quote(row)) for row in self.conn.execute(sql, params).fetchall()
+            if self.only is None or row["id"] in self.only
+        ]
+
+    def update(self, quote_id, fields=None, **kwargs):
+        fields = {**(fields or {}), **kwargs}
+        with self.conn:
+            row = self.conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+            if row is None:
+                seq = self.conn.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM quotes").fetchone()[0]
+                quote = {}
+            else:
+                seq, quote = row["seq"], self._quote(row)
+            if all(k in quote and quote[k] == v for k, v in fields.items()):
+                return
+            quote.update(fields)
+            self._write(quote_id, quote, seq)
+
+    def close(self):
+        self.conn.close()
+
+    def compact(self):
+        self.export_json(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Updates are committed either way, only a clean exit writes them back to the JSON
+        if exc_type is None:
+            self.compact()
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sync quotedata.json with its SQLite copy, or query it")
+    parser.add_argument("action", choices=["import", "export", "query"])
+    parser.add_argument("--json", default="quotedata.json")
+    parser.add_argument("--missing", help="query: only quotes where this field is empty")
+    parser.add_argument("--type", help="query: only quotes of this type")
+    args = parser.parse_args()
+
+    store = SqliteQuoteStore(args.json)
+    if args.action == "import":
+        print(f"Imported {store.import_json(args.json)} quotes into {store.db_path}")
+    elif args.action == "export":
+        print(f"Exported {store.export_json(args.json)} quotes to {args.json}")
+    else:
+        equals = {"type": args.type} if args.type else {}
+        for quote_id, quote in store.items(args.missing, **equals):
+            print(f"{quote_id}\t{quote.get('type')}\t{quote.get('year')}\t{quote.get('title')}")
+    store.close()
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Set by pipeline.py to the quote IDs that changed since its last run
+SELECTED_IDS_ENV = "JOEDLE_QUOTE_IDS"
+# "sqlite" makes open_store() use the SQLite backend in sqlstore.py
+STORE_ENV = "JOEDLE_STORE"
+
+
+def selected_ids():
+    """Returns the set of quote IDs a stage should limit itself to, or None for all of them."""
+    value = os.environ.get(SELECTED_IDS_ENV)
+    if value is None:
+        return None
+    return {quote_id for quote_id in value.split(",") if quote_id}
+
+
+def open_json(file, default=None):
+    p = Path(file)
+    if not p.exists():
+        return default
+    else:
+        with open(file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def save_json(file, data, indent=2):
+    """Writes data to a temp file next to `file` and swaps it in, so readers never see a partial file."""
+    tmp = f"{file}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, file)
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in chunks, or None if it doesn't exist."""
+    p = Path(path)
+    if not p.exists():
+        return None
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class QuoteStore:
+    """quotedata.json plus an append-only journal of per-quote updates.
+
+    Every update() is appended to `<path>.journal` and fsynced, so it survives a crash
+    without rewriting the whole file. compact() folds everything into `path` with one
+    atomic write and drops the journal. Opening a store replays a leftover journal, so
+    an interrupted stage picks up where it stopped. The journal starts with the hash of
+    the file it was written against; if something rewrote `path` since, replaying it
+    would undo that write, so the journal is set aside as `<path>.journal.stale`
+    instead. When `only` is given, items() only yields those quote IDs.
+
+        with QuoteStore() as store:
+            for quote_id, quote in store.items():
+                store.update(quote_id, year=2020)
+    """
+
+    def __init__(self, path="quotedata.json", only=None):
+        self.path = path
+        self.only = only
+        self.journal_path = f"{path}.journal"
+        self.data = open_json(path, {})
+        self.base_hash = file_hash(path)
+        self._journal = None
+        self.replayed = self._replay()
+        if self.replayed:
+            print(f"Replayed {self.replayed} journaled updates into {path}")
+
+    def _replay(self):
+        p = Path(self.journal_path)
+        if not p.exists():
+            return 0
+        if p.stat().st_size == 0:
+            p.unlink()
+            return 0
+        count = 0
+        good = 0
+        with open(p, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    # A crash mid-append leaves a torn last line, everything before it is intact
+                    break
+                if good == 0:
+                    if record.get("base", "") != self.base_hash:
+                        break
+                    good += len(line)
+                    continue
+                self.data.setdefault(record["id"], {}).update(record["set"])
+                good += len(line)
+                count += 1
+        if good == 0:
+            stale = f"{self.journal_path}.stale"
+            os.replace(p, stale)
+            print(f"{self.path} changed after {self.journal_path} was written, moved it to {stale} without replaying")
+            return 0
+        if good != p.stat().st_size:
+            # Cut the torn tail off so new appends start on a clean line
+            with open(p, "r+b") as f:
+                f.truncate(good)
+        return count
+
+    def __contains__(self, quote_id):
+        return quote_id in self.data
+
+    def __getitem__(self, quote_id):
+        return self.data[quote_id]
+
+    def __len__(self):
+        return len(self.data)
+
+    def items(self, missing=None, **equals):
+        """Returns (quote_id, quote) pairs, optionally only quotes where `missing` is unset or
+        empty and every field in `equals` has the given value, e.g. items(type="Stream", missing="year")."""
+        if self.only is None and missing is None and not equals:
+            return self.data.items()
+        return [
+            (quote_id, quote) for quote_id, quote in self.data.items()
+            if (self.only is None or quote_id in self.only)
+            and (missing is None or not quote.get(missing))
+            and all(quote.get(k) == v for k, v in equals.items())
+        ]
+
+    def update(self, quote_id, fields=None, **kwargs):
+        fields = {**(fields or {}), **kwargs}
+        quote = self.data.setdefault(quote_id, {})
+        if all(k in quote and quote[k] == v for k, v in fields.items()):
+            return
+        quote.update(fields)
+        if self._journal is None:
+            new = not Path(self.journal_path).exists()
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            if new:
+                self._journal.write(json.dumps({"base": self.base_hash}) + "\n")
+        self._journal.write(json.dumps({"id": quote_id, "set": fields}, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def compact(self):
+        self.close()
+        save_json(self.path, self.data)
+        if Path(self.journal_path).exists():
+            os.remove(self.journal_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Only compact on a clean exit, an interrupted run keeps its journal for the next one
+        if exc_type is None:
+            self.compact()
+        else:
+            self.close()
+
+
+def open_store(path="quotedata.json", only=None):
+    """Opens quotedata.json through the backend picked by JOEDLE_STORE, the JSON journal by default."""
+    if os.environ.get(STORE_ENV) == "sqlite":
+        from sqlstore import SqliteQuoteStore
+        return SqliteQuoteStore(path, only=only)
+    return QuoteStore(path, only=only)
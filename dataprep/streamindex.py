@@ -0,0 +1,39 @@
+import bisect
+from collections import namedtuple
+
+from sheets import streams
+from ytfetch import timestamp, video_id
+
+StreamEntry = namedtuple("StreamEntry", ["date", "game", "stream_nr", "year", "start"])
+
+
+class StreamIndex:
+    """Hash index of streamdata.tsv from video ID to the streams in that VOD.
+
+    A VOD can hold several games back to back, e.g. youtu.be/<id> for NieR and
+    youtu.be/<id>&t=6202s for Mark of the Ninja, so each ID maps to its entries
+    sorted by start offset and a quote resolves to the last one starting before
+    its own t= offset.
+    """
+
+    def __init__(self, path="streamdata.tsv", title_map=None):
+        title_map = title_map or {}
+        self.by_id = {}
+        for row in streams(path):
+            game = title_map.get(row.game, row.game)
+            for vid, start in row.sources:
+                entries = self.by_id.setdefault(vid, [])
+                entry = StreamEntry(row.date, game, row.stream_nr, row.year, start)
+                if entry not in entries:
+                    bisect.insort(entries, entry, key=lambda e: e.start)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def lookup(self, url):
+        """Returns the StreamEntry a quote URL points into, or None if its video is unknown."""
+        entries = self.by_id.get(video_id(url))
+        if not entries:
+            return None
+        i = bisect.bisect_right(entries, timestamp(url), key=lambda e: e.start)
+        return entries[max(i - 1, 0)]
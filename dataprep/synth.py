@@ -0,0 +1,156 @@
+import csv
+import datetime
+import random
+import string
+from pathlib import Path
+
+from sheets import iter_quotes, iter_streams, iter_videos
+from store import open_json, save_json
+
+SCALES = (10, 100, 1000)
+OUT_DIR = "synth"
+# Bump when generate() changes what it writes, so corpora already on disk get regenerated
+CORPUS_VERSION = 2
+CORPUS_FILE = "corpus.json"
+
+_ID_CHARS = string.ascii_letters + string.digits + "-_"
+
+
+def _video_id(rng):
+    return "".join(rng.choice(_ID_CHARS) for _ in range(11))
+
+
+def _days(rng, count, span):
+    """count sorted dates drawn uniformly from span, a (first, last) pair."""
+    first, last = span
+    width = (last - first).days + 1
+    return [first + datetime.timedelta(days=d) for d in sorted(rng.randrange(width) for _ in range(count))]
+
+
+def _misspell(rng, title):
+    """A spelling of title the way it turns up in the sheets: case, punctuation or a typo off."""
+    kind = rng.randrange(3)
+    if kind == 0:
+        return title.lower()
+    if kind == 1:
+        return title.replace(":", "").replace("'", "")
+    i = rng.randrange(len(title))
+    return title[:i] + title[i + 1:]
+
+
+class Corpus:
+    """Vocabulary and proportions taken from the real sheets, to draw synthetic rows from."""
+
+    def __init__(self, quotestodo="quotestodo.tsv", streamdata="streamdata.tsv", videotypes="joevideotypes.tsv",
+                 quotedata="quotedata.json"):
+        self.words = [w for row in iter_quotes(quotestodo) for w in row.quote.split()]
+        streams = list(iter_streams(streamdata))
+        videos = [row for row in iter_videos(videotypes) if row.type == "Video"]
+        self.games = sorted({row.game for row in streams if row.game})
+        self.videos = sorted({row.game for row in videos})
+        # Larger corpora fit more streams and videos into the same years, so every date
+        # and year stays one the real sheets could hold
+        self.stream_span = (min(r.date for r in streams if r.date), max(r.date for r in streams if r.date))
+        self.video_span = (min(r.date for r in videos if r.date), max(r.date for r in videos if r.date))
+        quote_data = open_json(quotedata, {})
+        self.types = [q.get("type") or "Stream" for q in quote_data.values()]
+        self.streams_per_quote = len(streams) / max(1, len(quote_data))
+
+    def game(self, rng, scale):
+        # Sequels keep the number of distinct games growing with the corpus
+        base = rng.choice(self.games)
+        n = rng.randrange(scale)
+        return base if n == 0 else f"{base} {n + 1}"
+
+    def quote_text(self, rng):
+        start = rng.randrange(len(self.words))
+        text = " ".join(self.words[start:start + rng.randint(8, 60)])
+        return text.replace("[X]", "") + (" [X]" if rng.random() < 0.03 else "")
+
+
+def generate(scale, out_dir=None, seed=0, corpus=None):
+    """Writes a synthetic quotestodo/streamdata/joevideotypes/title_map/quotedata set `scale` times the real size.
+
+    Streams and videos are generated first, quotes then point into their VODs with a
+    t= offset, so the stream index, the title matcher and the schedulers all see the
+    same kind of structure they do on the real data. quotedata.json is filled in as
+    stage 5 would leave it, so 6.shuffle.py runs on it directly. Returns the directory.
+    """
+    corpus = corpus or Corpus()
+    rng = random.Random(f"{seed}:{scale}")
+    out = Path(out_dir or f"{OUT_DIR}/{scale}x")
+    out.mkdir(parents=True, exist_ok=True)
+
+    n_quotes = len(corpus.types) * scale
+    streams = []
+    with open(out / "streamdata.tsv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        writer.writerow(["Date", "Game", "Stream #", "src1", "src2", "src3"])
+        previous = None
+        for day in _days(rng, int(n_quotes * corpus.streams_per_quote), corpus.stream_span):
+            game = corpus.game(rng, scale)
+            vid = _video_id(rng)
+            streams.append((game, vid, day.year))
+            # Like the real sheet, more streams on the same day leave the date blank
+            writer.writerow([
+                "" if day == previous else day.strftime("%a, %m/%d/%Y"), game, rng.choice(("", "1", "2", "3", "4")),
+                rng.choice(("", "", "Unrendered")), "", f"youtu.be/{vid}",
+            ])
+            previous = day
+
+    videos = []
+    with open(out / "joevideotypes.tsv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        writer.writerow(["Type", "Date", "Game"])
+        for i, day in enumerate(_days(rng, len(corpus.videos) * scale, corpus.video_span)):
+            title = f"{rng.choice(corpus.videos)}" + (f" - Part {i}" if scale > 1 else "")
+            videos.append((title, _video_id(rng), day.year))
+            writer.writerow(["Video", day.strftime("%a, %m/%d/%Y"), title])
+
+    title_map = {}
+    for game, _, _ in rng.sample(streams, min(len(streams), 90 * scale)):
+        title_map[_misspell(rng, game)] = game
+    save_json(out / "title_map.json", title_map)
+
+    quote_data = {}
+    with open(out / "quotestodo.tsv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        writer.writerow(["quote_id", "Quote", "Title", "URL", "Year", "Type"])
+        for i in range(1, n_quotes + 1):
+            kind = rng.choice(corpus.types)
+            if kind == "YouTube":
+                title, vid, year = rng.choice(videos)
+                game = title.split(" - ")[0]
+            else:
+                game, vid, year = rng.choice(streams)
+                title = game
+            url = f"https://www.youtube.com/watch?v={vid}&t={rng.randrange(30000)}s"
+            text = corpus.quote_text(rng)
+            raw_title = _misspell(rng, title) if rng.random() < 0.1 else title
+            writer.writerow([str(i), text, raw_title, url, "", ""])
+            quote_data[str(i)] = {"quote": text, "title": title, "url": url, "year": year, "type": kind, "game": game}
+    save_json(out / "quotedata.json", quote_data)
+    save_json(out / CORPUS_FILE, {"version": CORPUS_VERSION, "scale": scale, "seed": seed})
+    return out
+
+
+def is_current(directory, scale, seed=0):
+    """Whether directory holds the corpus generate(scale, directory, seed) would write now."""
+    return open_json(Path(directory) / CORPUS_FILE, {}) == {"version": CORPUS_VERSION, "scale": scale, "seed": seed}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate synthetic corpora shaped like the real sheets")
+    parser.add_argument("scales", nargs="*", type=int, default=list(SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = Corpus()
+    for scale in args.scales:
+        start = time.perf_counter()
+        out = generate(scale, seed=args.seed, corpus=corpus)
+        sizes = ", ".join(f"{p.name} {p.stat().st_size / 1e6:.1f} MB" for p in sorted(out.iterdir()) if p.is_file())
+        print(f"{scale}x -> {out} in {time.perf_counter() - start:.1f}s ({sizes})")
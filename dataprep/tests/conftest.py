@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# The dataprep modules import each other as top-level modules, the way the scripts run them
+DATAPREP = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DATAPREP))
+
+# Frozen copies of the listings and of quotedata.json, the live ones change with every ingest
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
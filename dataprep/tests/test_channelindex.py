@@ -0,0 +1,69 @@
+import json
+
+from channelindex import CHANNEL, build_table, classify, load_table, merge_metadata, missing_ids
+from conftest import FIXTURES
+from ytfetch import video_id
+
+
+def fixture_table():
+    return load_table(FIXTURES / "channel_listing.json", FIXTURES / "stream_listing.json")
+
+
+def test_build_table_reads_both_listings():
+    table = fixture_table()
+    assert len(table) == 272
+    assert all(len(vid) == 11 for vid in table)
+    joe = [meta for meta in table.values() if meta["channel"] == CHANNEL]
+    assert len(joe) == 53
+    # Joe's listing only has timestamps, they become upload dates
+    assert all(len(meta["upload_date"]) == 8 and meta["upload_date"].isdigit() for meta in joe)
+    assert all(meta["title"] for meta in table.values())
+
+
+def test_build_table_walks_nested_tabs():
+    listing = {
+        "channel": CHANNEL,
+        "entries": [
+            {"title": "Videos", "entries": [{"id": "aaaaaaaaaaa", "title": "A", "timestamp": 1500000000}]},
+            {"title": "Live", "entries": [None, {"url": "https://www.youtube.com/watch?v=bbbbbbbbbbb", "title": "B"}]},
+        ],
+    }
+    table = build_table(listing)
+    assert table == {
+        "aaaaaaaaaaa": {"channel": CHANNEL, "title": "A", "upload_date": "20170714"},
+        "bbbbbbbbbbb": {"channel": CHANNEL, "title": "B", "upload_date": None},
+    }
+
+
+def test_listings_classify_the_quotes():
+    table = fixture_table()
+    with open(FIXTURES / "quotes.json", "r", encoding="utf-8") as f:
+        quote_data = json.load(f)
+    listed = [q for q in quote_data.values() if video_id(q["url"]) in table]
+    assert len(listed) == 312
+    for quote in listed:
+        assert classify(table[video_id(quote["url"])]) == quote["type"], quote["url"]
+    # Quote 106 is a video on neither channel, the only one that still needs an extraction
+    assert missing_ids([q["url"] for q in quote_data.values()], table) == ["O4ALtyWy2Yg"]
+
+
+def test_missing_ids():
+    table = {
+        "joedated0000": {"channel": CHANNEL, "title": "A", "upload_date": "20200101"},
+        "joeundated00": {"channel": CHANNEL, "title": "B", "upload_date": None},
+        "streamvod000": {"channel": "Stream Archive", "title": "C", "upload_date": None},
+    }
+    urls = [f"https://youtu.be/{vid}" for vid in ("joedated000", "joeundated0", "streamvod00", "unlisted000")]
+    table = {vid[:11]: meta for vid, meta in table.items()}
+    # Unlisted videos need extracting, and so do Joe's videos without a date; streams don't need one
+    assert missing_ids(urls, table) == ["joeundated0", "unlisted000"]
+
+
+def test_failed_extraction_keeps_the_listing():
+    listed = {"joeundated0": {"channel": CHANNEL, "title": "B", "upload_date": None}}
+    fetched = {"joeundated0": None, "unlisted000": None}
+    merged = merge_metadata(listed, fetched)
+    assert merged == listed
+    assert classify(merged["joeundated0"]) == "YouTube"
+    fetched = {"joeundated0": {"channel": CHANNEL, "title": "B", "upload_date": "20200101"}}
+    assert merge_metadata(listed, fetched) == fetched
@@ -0,0 +1,38 @@
+import json
+
+from conftest import FIXTURES
+from dedup import find_duplicates, text_duplicates
+
+
+def real_quotes():
+    with open(FIXTURES / "quotes.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_excerpts_of_long_quotes_are_flagged():
+    # A curator pasting part of a quote that's already in: tiny Jaccard, 100% contained
+    quotes = real_quotes()
+    longest = sorted(quotes, key=lambda qid: len(quotes[qid]["quote"].split()), reverse=True)[:20]
+    excerpts = {}
+    for i, qid in enumerate(longest):
+        words = quotes[qid]["quote"].split()
+        middle = len(words) // 2
+        excerpts[str(len(quotes) + i + 1)] = {"quote": " ".join(words[middle:middle + 12]), "url": ""}
+    flagged = {(a, b) for a, b, _ in text_duplicates({**quotes, **excerpts}, only=set(excerpts))}
+    for i, qid in enumerate(longest):
+        assert (qid, str(len(quotes) + i + 1)) in flagged
+
+
+def test_only_limits_the_report():
+    quotes = {
+        "1": {"quote": "the quick brown fox jumps over the lazy dog", "url": ""},
+        "2": {"quote": "the quick brown fox jumps over the lazy dog", "url": ""},
+        "3": {"quote": "something else entirely, nothing in common here", "url": ""},
+    }
+    assert [(a, b) for a, b, _ in find_duplicates(quotes)] == [("1", "2")]
+    assert find_duplicates(quotes, only={"3"}) == []
+
+
+def test_no_false_positives_on_the_real_quotes():
+    # A snapshot known to be free of duplicates, so anything flagged here is the checker's fault
+    assert text_duplicates(real_quotes()) == []
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from permutation import FeistelPermutation, PermutationSchedule
+from schedule import Schedule
+
+START = "2026-01-05"
+
+
+def quote(i):
+    return {"quote": f"quote {i}", "title": f"title {i}", "url": "", "year": 2026, "type": "Stream", "game": f"game {i}"}
+
+
+def random_batch(rng, schedule, new_quotes):
+    dates = list(schedule.dates())
+    inserts = [(rng.choice(dates), next(new_quotes)) for _ in range(rng.randint(0, 3))]
+    removes = rng.sample(dates, rng.randint(0, 3))
+    swaps = [tuple(rng.sample(dates, 2)) for _ in range(rng.randint(0, 2))]
+    reservations = rng.sample(dates, rng.randint(0, 2))
+    return {"inserts": inserts, "removes": removes, "swaps": swaps, "reservations": reservations}
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_recorded_edits_match_schedule_apply(seed):
+    rng = random.Random(seed)
+    quote_data = {str(i): quote(i) for i in range(1, rng.randint(2, 12))}
+    permutation = PermutationSchedule.create(quote_data, START, key=rng.randrange(1 << 32))
+    schedule = Schedule(START, permutation.days(START, 60).values())
+    new_quotes = (quote(f"new {i}") for i in range(1000))
+
+    # Several batches in a row, so edits also land on days earlier batches moved
+    for _ in range(3):
+        batch = random_batch(rng, schedule, new_quotes)
+        schedule.apply(**batch)
+        permutation.record(**batch)
+        # The permutation goes on past the materialized days, every day of the edited list has to agree
+        assert permutation.days(START, len(schedule)) == schedule.to_dict(), batch
+
+
+def test_dates_before_the_start_are_refused():
+    permutation = PermutationSchedule.create({"1": quote(1)}, START)
+    with pytest.raises(KeyError):
+        permutation.record(removes=["2026-01-04"])
+    assert permutation.spec["edits"] == []
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 16, 17, 314])
+def test_every_cycle_is_a_permutation(n):
+    for cycle in range(5):
+        perm = FeistelPermutation(n, 11037, cycle)
+        assert sorted(perm(i) for i in range(n)) == list(range(n))
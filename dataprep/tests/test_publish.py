@@ -0,0 +1,32 @@
+import gzip
+
+import publish
+from publish import write_published
+
+
+def test_outdated_variants_are_rewritten(tmp_path):
+    path = tmp_path / "manifest.json"
+    write_published(path, b'{"old": 1}')
+    path.write_bytes(b'{"new": 2}')  # the main file already current, its variants not
+    write_published(path, b'{"new": 2}')
+    assert gzip.decompress((tmp_path / "manifest.json.gz").read_bytes()) == b'{"new": 2}'
+
+
+def test_variants_without_a_compressor_are_deleted(tmp_path, monkeypatch):
+    path = tmp_path / "manifest.json"
+    (tmp_path / "manifest.json.br").write_bytes(b"left over from a host with brotli")
+    monkeypatch.setattr(publish, "COMPRESSORS", {".gz": publish.COMPRESSORS[".gz"]})
+    write_published(path, b"{}")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["manifest.json", "manifest.json.gz"]
+
+
+def test_unchanged_files_are_not_compressed_again(tmp_path, monkeypatch):
+    path = tmp_path / "manifest.json"
+    write_published(path, b"{}")
+    calls = []
+    monkeypatch.setattr(publish, "COMPRESSORS", {
+        suffix: (lambda data, compress=compress: calls.append(suffix) or compress(data), decompress)
+        for suffix, (compress, decompress) in publish.COMPRESSORS.items()
+    })
+    write_published(path, b"{}")
+    assert calls == []
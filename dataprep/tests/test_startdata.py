@@ -0,0 +1,50 @@
+import json
+import runpy
+
+from conftest import DATAPREP
+
+HEADER = "quote_id\tQuote\tTitle\tURL\tYear\tType\n"
+URL = "https://www.youtube.com/watch?v=eDMHFeP2rDE&t=2254s"
+
+
+def write_todo(path, rows):
+    path.write_text(HEADER + "".join(f"{i}\t{quote}\t{title}\t{URL}\t\t\n" for i, quote, title in rows), encoding="utf-8")
+
+
+def start(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("JOEDLE_QUOTE_IDS", raising=False)
+    runpy.run_path(str(DATAPREP / "1.startdata.py"), run_name="__main__")
+    return json.loads((tmp_path / "quotedata.json").read_text(encoding="utf-8"))
+
+
+def fill_in(tmp_path, **titles):
+    # What the later stages do to quotedata.json
+    path = tmp_path / "quotedata.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for quote_id, title in titles.items():
+        data[quote_id].update(title=title, type="Stream", year=2020, game=title)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_edited_rows_are_rebuilt_without_the_pipeline(tmp_path, monkeypatch):
+    todo = tmp_path / "quotestodo.tsv"
+    write_todo(todo, [("1", "The first quote with a typo", "Some game"), ("2", "The second quote", "Another game")])
+    start(tmp_path, monkeypatch)
+    fill_in(tmp_path, **{"1": "Some Game", "2": "Another Game"})
+
+    write_todo(todo, [("1", "The first quote without one", "Some game"), ("2", "The second quote", "Another game")])
+    quotes = start(tmp_path, monkeypatch)
+    assert quotes["1"]["quote"] == "The first quote without one"
+    assert quotes["1"]["type"] == ""  # back to the TSV, for the later stages to fill in again
+    assert quotes["2"]["title"] == "Another Game"  # untouched rows keep what the later stages put there
+
+
+def test_first_run_takes_quotedata_as_current(tmp_path, monkeypatch):
+    write_todo(tmp_path / "quotestodo.tsv", [("1", "A quote", "reddit link")])
+    # A hand fix that differs from its row, from before row hashes were recorded
+    (tmp_path / "quotedata.json").write_text(json.dumps({"1": {"quote": "A quote", "title": "Fixed by hand"}}),
+                                             encoding="utf-8")
+    quotes = start(tmp_path, monkeypatch)
+    assert quotes["1"]["title"] == "Fixed by hand"
+    assert (tmp_path / "quotestodo_rows.json").exists()
@@ -0,0 +1,47 @@
+import json
+
+from store import QuoteStore, save_json
+
+
+def test_journal_resumes_an_interrupted_stage(tmp_path):
+    path = tmp_path / "quotedata.json"
+    save_json(path, {"1": {"title": "a"}})
+    store = QuoteStore(str(path))
+    store.update("1", title="journaled")
+    store.close()  # no compact, as after a crash
+
+    store = QuoteStore(str(path))
+    assert store.replayed == 1
+    assert store["1"]["title"] == "journaled"
+    store.close()
+
+
+def test_journal_is_not_replayed_over_a_newer_file(tmp_path):
+    path = tmp_path / "quotedata.json"
+    save_json(path, {"1": {"title": "a"}})
+    store = QuoteStore(str(path))
+    store.update("1", title="journaled")
+    store.close()
+
+    # 1.startdata.py and 3.fillstream.py rewrite the whole file without the store
+    save_json(path, {"1": {"title": "newer"}})
+    with QuoteStore(str(path)) as store:
+        assert store.replayed == 0
+        assert store["1"]["title"] == "newer"
+    assert json.loads(path.read_text(encoding="utf-8")) == {"1": {"title": "newer"}}
+    assert (tmp_path / "quotedata.json.journal.stale").exists()
+
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    path = tmp_path / "quotedata.json"
+    save_json(path, {"1": {"title": "a"}})
+    store = QuoteStore(str(path))
+    store.update("1", title="b")
+    store.close()
+    with open(f"{path}.journal", "a", encoding="utf-8") as f:
+        f.write('{"id": "1", "se')
+
+    store = QuoteStore(str(path))
+    assert store.replayed == 1
+    assert store["1"]["title"] == "b"
+    store.close()
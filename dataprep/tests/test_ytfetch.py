@@ -0,0 +1,20 @@
+from ytfetch import FixtureExtractor, fetch_metadata
+
+
+def test_an_extractor_that_cant_be_built_fails_its_videos_only():
+    def make_extractor():
+        raise RuntimeError("yt_dlp isn't installed")
+
+    urls = ["https://youtu.be/aaaaaaaaaaa", "https://youtu.be/bbbbbbbbbbb"]
+    assert fetch_metadata(urls, make_extractor, None, workers=2) == {"aaaaaaaaaaa": None, "bbbbbbbbbbb": None}
+
+
+def test_failed_lookups_are_not_cached(tmp_path):
+    cache = str(tmp_path / "youtube_cache.json")
+    infos = {"aaaaaaaaaaa": {"channel": "Joseph Anderson", "title": "A", "upload_date": "20200101", "formats": []}}
+    urls = ["https://youtu.be/aaaaaaaaaaa", "https://youtu.be/bbbbbbbbbbb"]
+    first = fetch_metadata(urls, lambda: FixtureExtractor(infos), cache, workers=2)
+    assert first == {"aaaaaaaaaaa": {"channel": "Joseph Anderson", "title": "A", "upload_date": "20200101"},
+                     "bbbbbbbbbbb": None}
+    infos["bbbbbbbbbbb"] = {"channel": "Stream Archive", "title": "B", "upload_date": None}
+    assert fetch_metadata(urls, lambda: FixtureExtractor(infos), cache, workers=2)["bbbbbbbbbbb"]["title"] == "B"
@@ -0,0 +1,200 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+from sheets import quotes, streams, videos
+from store import open_json, save_json
+
+THRESHOLD = 0.8
+# The best candidate has to beat the runner-up by this much, "Resident Evil 4" scores
+# the same against 3 and 7
+MARGIN = 0.05
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+# "i" is left out, it's a word far more often than a numeral
+_ROMAN = {r: str(i) for i, r in enumerate(["ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x", "xi", "xii"], 2)}
+
+
+def normalize(title):
+    """Lowercases, strips accents and punctuation so 'NieR:Automata' and 'Nier; Automata' compare equal."""
+    title = unicodedata.normalize("NFKD", title)
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    title = title.lower().replace("&", " and ")
+    title = _PUNCT_RE.sub(" ", title)
+    return _SPACE_RE.sub(" ", title).strip()
+
+
+def numbers(key):
+    """Digit and roman numeral tokens of a normalized title, as numbers: a sequel's numbers have to match."""
+    return {str(int(w)) if w.isdigit() else _ROMAN[w] for w in key.split() if w.isdigit() or w in _ROMAN}
+
+
+def ngrams(text, n=3):
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class TitleMatcher:
+    """Character n-gram inverted index from known title spellings to canonical titles.
+
+    Every known spelling is indexed under its n-grams. A lookup walks the postings of
+    the query's n-grams to count overlaps, so it only touches titles sharing at least
+    one n-gram with the query, and ranks them by Dice coefficient.
+    """
+
+    def __init__(self, names=None, n=3):
+        self.n = n
+        self.names = []  # normalized spelling
+        self.targets = []  # canonical title for each spelling
+        self.sizes = []
+        self.by_name = {}
+        self.postings = defaultdict(list)
+        for name, target in (names or {}).items():
+            self.add(name, target)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, target=None):
+        key = normalize(name)
+        if not key:
+            return
+        target = target or name
+        if key in self.by_name:
+            self.targets[self.by_name[key]] = target
+            return
+        i = len(self.names)
+        grams = ngrams(key, self.n)
+        self.names.append(key)
+        self.targets.append(target)
+        self.sizes.append(len(grams))
+        self.by_name[key] = i
+        for gram in grams:
+            self.postings[gram].append(i)
+
+    def candidates(self, query, limit=5):
+        """Returns up to `limit` (canonical title, score) pairs, best first."""
+        key = normalize(query)
+        if key in self.by_name:
+            exact = self.targets[self.by_name[key]]
+            return [(exact, 1.0)] + [c for c in self._ranked(key, limit) if c[0] != exact][:limit - 1]
+        return self._ranked(key, limit)
+
+    def _ranked(self, key, limit):
+        grams = ngrams(key, self.n)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                overlap[i] += 1
+        best = {}
+        for i, shared in overlap.items():
+            score = 2 * shared / (len(grams) + self.sizes[i])
+            target = self.targets[i]
+            if score > best.get(target, 0):
+                best[target] = score
+        return sorted(best.items(), key=lambda c: (-c[1], c[0]))[:limit]
+
+    def choose(self, query, threshold=THRESHOLD, margin=MARGIN):
+        """Returns (canonical title or None, ranked candidates) for query.
+
+        A known spelling always matches. Anything else needs a best candidate that
+        scores at least threshold, leads the runner-up by margin and has the same
+        numbers as the query, so "The Witcher 2" never turns into "The Witcher 3".
+        """
+        key = normalize(query)
+        ranked = self.candidates(query, 3)
+        if not ranked:
+            return None, ranked
+        if key in self.by_name:
+            return ranked[0][0], ranked
+        best, score = ranked[0]
+        if score < threshold or (len(ranked) > 1 and score - ranked[1][1] < margin):
+            return None, ranked
+        if numbers(normalize(best)) != numbers(key):
+            return None, ranked
+        return best, ranked
+
+    def match(self, query, threshold=THRESHOLD, margin=MARGIN):
+        """Returns the canonical title for query when choose() accepts one, else None."""
+        return self.choose(query, threshold, margin)[0]
+
+
+def known_titles(title_map, streamdata="streamdata.tsv", videotypes="joevideotypes.tsv"):
+    """Returns spelling -> canonical title for every title in the sheets and the title map."""
+    names = {}
+    for row in [*videos(videotypes), *streams(streamdata)]:
+        title = row.game.strip()
+        if title:
+            names[title] = title_map.get(title, title)
+    for canonical in title_map.values():
+        names[canonical] = canonical
+    names.update(title_map)
+    return names
+
+
+def load_matcher(title_map):
+    return TitleMatcher(known_titles(title_map))
+
+
+def learn(title_map, raw, canonical, matcher=None, path="title_map.json"):
+    """Records raw -> canonical in the title map, the matcher and on disk."""
+    title_map[raw] = canonical
+    if matcher is not None:
+        matcher.add(raw, canonical)
+    save_json(path, title_map)
+
+
+def normalize_batch(raw_titles, title_map, matcher, threshold=THRESHOLD):
+    """Maps every raw title in one pass, returning (accepted, unresolved).
+
+    Titles already in the title map are kept as is, the rest are auto-accepted when
+    TitleMatcher.choose() accepts the best candidate. unresolved maps each leftover
+    title to its ranked candidates for a human to look at.
+    """
+    accepted = {}
+    unresolved = {}
+    for raw in dict.fromkeys(raw_titles):
+        if raw in title_map:
+            continue
+        match, ranked = matcher.choose(raw, threshold)
+        if match is not None:
+            accepted[raw] = match
+            matcher.add(raw, match)
+        else:
+            unresolved[raw] = ranked
+    return accepted, unresolved
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Normalize every quote title in quotestodo.tsv without prompting")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--dry-run", action="store_true", help="don't write title_map.json")
+    args = parser.parse_args()
+
+    title_map = open_json("title_map.json", {})
+    matcher = load_matcher(title_map)
+
+    # Only stream titles go through the title map, videos keep their YouTube title
+    quote_data = open_json("quotedata.json", {})
+    raw_titles = [
+        row.title for row in quotes("quotestodo.tsv")
+        if quote_data.get(row.quote_id, {}).get("type", "Stream") == "Stream"
+    ]
+
+    accepted, unresolved = normalize_batch(raw_titles, title_map, matcher, args.threshold)
+
+    for raw, canonical in accepted.items():
+        print(f"{raw} -> {canonical}")
+    for raw, ranked in unresolved.items():
+        suggestions = ", ".join(f"{title} ({score:.2f})" for title, score in ranked[:3])
+        print(f"UNRESOLVED {raw}: {suggestions}")
+    print(f"{len(accepted)} accepted, {len(unresolved)} unresolved")
+
+    if accepted and not args.dry_run:
+        title_map.update(accepted)
+        save_json("title_map.json", title_map)
@@ -0,0 +1,119 @@
+import datetime
+import json
+import re
+
+from catalog import PLACEHOLDERS
+
+REQUIRED = ("quote", "title", "url", "year", "type", "game")
+TYPES = ("YouTube", "Stream", "Other", "Reddit", "Unknown")
+# Same pattern quoteDisplay in App.vue substitutes the game name into
+GAME_MARKER = re.compile(r"\[X\]", re.IGNORECASE)
+
+
+class ValidationError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        shown = "\n".join(errors[:20])
+        more = f"\n... and {len(errors) - 20} more" if len(errors) > 20 else ""
+        super().__init__(f"{len(errors)} problems found:\n{shown}{more}")
+
+
+def check_quote(quote, where):
+    """Returns a list of problems with a single quote, each prefixed with `where`."""
+    if not isinstance(quote, dict):
+        return [f"{where}: expected an object, found {type(quote).__name__}"]
+    errors = [f"{where}: missing {field}" for field in REQUIRED if field not in quote]
+    if quote.get("quote") in PLACEHOLDERS:
+        return errors
+
+    text = quote.get("quote")
+    if not isinstance(text, str) or not text.strip():
+        errors.append(f"{where}: quote is empty")
+    elif GAME_MARKER.search(text) and not (isinstance(quote.get("game"), str) and quote["game"].strip()):
+        errors.append(f"{where}: quote has [X] but no game to put in its place")
+    year = quote.get("year")
+    # bool is an int subclass, but True isn't a year
+    if "year" in quote and (type(year) is not int or not 1990 <= year <= 2100):
+        errors.append(f"{where}: year {year!r} is not an int year")
+    if "type" in quote and quote["type"] not in TYPES:
+        errors.append(f"{where}: unknown type {quote['type']!r}")
+    for field in ("title", "url"):
+        if field in quote and not (isinstance(quote[field], str) and quote[field].strip()):
+            errors.append(f"{where}: {field} is empty")
+    return errors
+
+
+def check_quote_data(quote_data):
+    errors = []
+    for quote_id, quote in quote_data.items():
+        errors.extend(check_quote(quote, f"quote {quote_id}"))
+    return errors
+
+
+def check_schedule(pairs):
+    """Checks a schedule given as (date, quote) pairs in file order, in one pass.
+
+    Every date has to be exactly one day after the one before it, which catches
+    gaps, duplicates and out of order dates alike.
+    """
+    if isinstance(pairs, dict):
+        pairs = pairs.items()
+    errors = []
+    one = datetime.timedelta(days=1)
+    expected = None
+    for date_str, quote in pairs:
+        try:
+            day = datetime.date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            errors.append(f"{date_str}: not a YYYY-MM-DD date")
+            continue
+        if expected is not None and day != expected:
+            if day < expected:
+                errors.append(f"{date_str}: duplicate or out of order, expected {expected.isoformat()}")
+            else:
+                errors.append(f"{date_str}: gap, {(day - expected).days} days missing from {expected.isoformat()}")
+        expected = day + one
+        errors.extend(check_quote(quote, date_str))
+    return errors
+
+
+class _PairsDict(dict):
+    def __init__(self, pairs):
+        super().__init__(pairs)
+        self.pairs = pairs
+
+
+def load_pairs(path):
+    """Reads a JSON object as a list of pairs, so repeated keys aren't silently merged."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f, object_pairs_hook=_PairsDict).pairs
+
+
+def validate_schedule(quotes):
+    errors = check_schedule(quotes)
+    if errors:
+        raise ValidationError(errors)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Check quotedata.json and a published schedule")
+    parser.add_argument("--quote-data", default="quotedata.json")
+    parser.add_argument("schedules", nargs="*", default=["quotes.json", "../public/quotes.json"])
+    args = parser.parse_args()
+
+    failed = False
+    for path, check in [(args.quote_data, lambda pairs: check_quote_data(dict(pairs)))] + [
+        (path, check_schedule) for path in args.schedules
+    ]:
+        start = time.perf_counter()
+        pairs = load_pairs(path)
+        errors = check(pairs)
+        elapsed = time.perf_counter() - start
+        for error in errors:
+            print(f"{path}: {error}")
+        print(f"{path}: {len(pairs)} entries, {len(errors)} problems ({elapsed * 1000:.1f} ms)")
+        failed |= bool(errors)
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,286 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+CACHE_FILE = "youtube_cache.json"
+FIXTURE_FILE = "fixtures/youtube_info.json"
+# A complete info dict as returned by a full extract_info call
+FULL_INFO_FIXTURE = "info.txt"
+FIELDS = ("channel", "title", "upload_date")
+
+# Running totals for this process, read by instrument.py
+STATS = {"extract_calls": 0, "cache_hits": 0, "failures": 0}
+
+# Hand-written links sometimes glue the timestamp onto the ID, e.g. youtu.be/<id>&t=90s
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}(?![A-Za-z0-9_-])")
+_TIME_RE = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?$")
+
+
+def video_id(url):
+    """Returns the 11 character video ID of a youtube.com/youtu.be URL, or None."""
+    if not url:
+        return None
+    if "//" not in url:
+        url = "https://" + url
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    candidate = None
+    if host.endswith("youtu.be"):
+        candidate = parsed.path.strip("/").split("/")[0]
+    elif "youtube.com" in host:
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("live", "shorts", "embed", "v"):
+                candidate = parts[1]
+    match = _ID_RE.match(candidate or "")
+    return match.group(0) if match else None
+
+
+def timestamp(url):
+    """Returns the t= offset of a video URL in seconds, 0 when it has none."""
+    if not url:
+        return 0
+    if "//" not in url:
+        url = "https://" + url
+    parsed = urlparse(url)
+    # youtu.be/<id>&t=90s puts the query in the path
+    query = parsed.query or parsed.path.partition("&")[2]
+    value = parse_qs(query).get("t", [""])[0]
+    match = _TIME_RE.match(value)
+    if not value or not match:
+        return 0
+    h, m, s = (int(g) if g else 0 for g in match.groups())
+    return h * 3600 + m * 60 + s
+
+
+# Skip the DASH/HLS manifests and player JS, which only matter for picking formats
+LIGHTWEIGHT_OPTS = {
+    "skip_download": True,
+    "check_formats": False,
+    "extractor_args": {"youtube": {"skip": ["dash", "hls", "translated_subs"], "player_skip": ["js"]}},
+}
+
+
+class YtDlpExtractor:
+    """Wraps one YoutubeDL instance, meant to be reused by a single worker thread.
+
+    By default it asks for a lightweight extraction, no format manifests and no
+    post-processing of the info dict (process=False), since the pipeline only reads
+    channel, title and upload_date. lightweight=False gives the old full extraction.
+    """
+
+    def __init__(self, lightweight=True):
+        import yt_dlp
+
+        opts = {"quiet": True}
+        if lightweight:
+            opts.update(LIGHTWEIGHT_OPTS)
+        self.process = not lightweight
+        self.ydl = yt_dlp.YoutubeDL(opts)
+
+    def extract(self, vid):
+        return self.ydl.extract_info(f"https://www.youtube.com/watch?v={vid}", download=False, process=self.process)
+
+
+class FixtureExtractor:
+    """Offline stand-in for YtDlpExtractor that answers from a dict of info dicts."""
+
+    def __init__(self, infos, latency=0.0):
+        self.infos = infos
+        self.latency = latency
+
+    def extract(self, vid):
+        if self.latency:
+            time.sleep(self.latency)
+        if vid not in self.infos:
+            raise KeyError(f"{vid} not in fixture")
+        return self.infos[vid]
+
+
+class ReplayExtractor:
+    """Offline stand-in that decodes one recorded response per lookup, the part of an extraction that
+    grows with what the response holds."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def extract(self, vid):
+        return json.loads(self.payload)
+
+
+def fixture_extractor(path=FIXTURE_FILE, latency=0.0):
+    """Returns a factory building FixtureExtractors that share one loaded fixture file."""
+    with open(path, "r", encoding="utf-8") as f:
+        infos = json.load(f)
+    return lambda: FixtureExtractor(infos, latency)
+
+
+def trim(info):
+    """Keeps only the FIELDS of an info dict."""
+    return {field: info.get(field) for field in FIELDS}
+
+
+def load_cache(path):
+    p = Path(path)
+    if not p.exists():
+        return {}
+    with open(p, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    # Entries are stored as [channel, title, upload_date] rows, older caches used dicts
+    return {vid: meta if isinstance(meta, dict) else dict(zip(FIELDS, meta)) for vid, meta in cache.items()}
+
+
+def save_cache(path, cache):
+    rows = {vid: [meta.get(field) for field in FIELDS] for vid, meta in sorted(cache.items())}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        # One video per line keeps the file diffable without the indent overhead
+        f.write("{\n")
+        lines = (json.dumps({vid: row}, ensure_ascii=False, separators=(",", ":"))[1:-1] for vid, row in rows.items())
+        f.write(",\n".join(lines))
+        f.write("\n}\n")
+    os.replace(tmp, path)
+
+
+def fetch_metadata(urls, make_extractor=YtDlpExtractor, cache_file=CACHE_FILE, workers=8):
+    """Looks up channel/title/upload_date for every video referenced by urls.
+
+    URLs are deduplicated by video ID and IDs already in the on-disk cache are not
+    looked up again. The remaining IDs are spread over a pool of at most `workers`
+    threads, each owning a single extractor built by `make_extractor`. Returns a dict
+    of video ID -> metadata dict, with None for IDs that failed to resolve.
+    """
+    cache = load_cache(cache_file) if cache_file else {}
+    ids = list(dict.fromkeys(vid for vid in map(video_id, urls) if vid))
+    todo = [vid for vid in ids if vid not in cache]
+    STATS["cache_hits"] += len(ids) - len(todo)
+    STATS["extract_calls"] += len(todo)
+
+    local = threading.local()
+
+    def lookup(vid):
+        try:
+            # Built here so an extractor that can't be set up fails its videos, not the stage
+            if not hasattr(local, "extractor"):
+                local.extractor = make_extractor()
+            return vid, trim(local.extractor.extract(vid))
+        except Exception as e:
+            print(f"Error processing {vid}: {e}")
+            return vid, None
+
+    results = {}
+    if todo:
+        print(f"Fetching {len(todo)} videos ({len(ids) - len(todo)} cached)")
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+            for vid, meta in pool.map(lookup, todo):
+                results[vid] = meta
+                if meta is None:
+                    STATS["failures"] += 1
+                else:
+                    cache[vid] = meta
+        if cache_file:
+            save_cache(cache_file, cache)
+
+    return {vid: cache.get(vid, results.get(vid)) for vid in ids}
+
+
+def benchmark(urls, fixture=FIXTURE_FILE, latency=0.05, workers=8):
+    """Times a cold serial run, a cold pooled run and a warm cached run over the fixture."""
+    import tempfile
+
+    make = fixture_extractor(fixture, latency)
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / CACHE_FILE)
+        for name, n, cache in (("serial", 1, None), ("pooled", workers, cache_file), ("cached", workers, cache_file)):
+            start = time.perf_counter()
+            fetch_metadata(urls, make, cache, n)
+            timings[name] = time.perf_counter() - start
+    return timings
+
+
+def compare_modes(count, full_fixture=FULL_INFO_FIXTURE, urls=None, workers=8):
+    """Compares the full extraction with the lightweight one.
+
+    Offline, it measures what the full info dict in full_fixture costs against the
+    trimmed record: bytes per video, the time to write and read back a cache of
+    `count` videos, and a replay of `count` lookups through fetch_metadata in which
+    every lookup decodes what its mode gets back. The replay leaves out the network,
+    so it is a lower bound on what full extraction costs. With urls it also times
+    both yt_dlp modes over those videos, which needs yt_dlp and network access.
+    """
+    import tempfile
+
+    with open(full_fixture, "r", encoding="utf-8") as f:
+        full = json.load(f)
+    vid = full.get("id", "x" * 11)
+    report = {
+        "full_bytes_per_video": len(json.dumps(full, ensure_ascii=False).encode("utf-8")),
+        "trimmed_bytes_per_video": len(json.dumps([full.get(field) for field in FIELDS], ensure_ascii=False).encode("utf-8")),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, meta, write in (
+            ("full", full, lambda path, cache: Path(path).write_text(json.dumps(cache, ensure_ascii=False), "utf-8")),
+            ("trimmed", trim(full), save_cache),
+        ):
+            cache = {f"{vid[:8]}{i:03d}": meta for i in range(count)}
+            path = str(Path(tmp) / f"{name}.json")
+            start = time.perf_counter()
+            write(path, cache)
+            load_cache(path)
+            report[f"{name}_cache_seconds"] = time.perf_counter() - start
+            report[f"{name}_cache_bytes"] = Path(path).stat().st_size
+
+    replay_urls = [f"https://youtu.be/{vid[:8]}{i:03d}" for i in range(count)]
+    for name, payload in (("full", json.dumps(full, ensure_ascii=False)),
+                          ("lightweight", json.dumps(trim(full), ensure_ascii=False))):
+        start = time.perf_counter()
+        fetch_metadata(replay_urls, lambda payload=payload: ReplayExtractor(payload), None, workers)
+        report[f"{name}_replay_seconds"] = time.perf_counter() - start
+        report[f"{name}_replay_bytes"] = len(payload.encode("utf-8")) * count
+
+    if urls:
+        for name, lightweight in (("full", False), ("lightweight", True)):
+            start = time.perf_counter()
+            fetch_metadata(urls, lambda: YtDlpExtractor(lightweight), None, workers)
+            report[f"{name}_extract_seconds"] = time.perf_counter() - start
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the metadata fetcher against the offline fixture")
+    parser.add_argument("--fixture", default=FIXTURE_FILE)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per extraction")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--compare-modes", action="store_true",
+                        help="compare full and lightweight extraction instead, replayed offline without the network, "
+                             "or live with --online")
+    parser.add_argument("--online", type=int, metavar="N", default=0,
+                        help="--compare-modes: also time both yt_dlp modes over the first N quote videos")
+    args = parser.parse_args()
+
+    with open("quotedata.json", "r", encoding="utf-8") as f:
+        urls = [q["url"] for q in json.load(f).values()]
+
+    if args.compare_modes:
+        ids = list(dict.fromkeys(vid for vid in map(video_id, urls) if vid))
+        report = compare_modes(len(ids), urls=urls[:args.online] if args.online else None, workers=args.workers)
+        for key, value in report.items():
+            print(f"{key:>26}: {value:,.3f}" if isinstance(value, float) else f"{key:>26}: {value:,}")
+        print(f"{'saved per video':>26}: {report['full_bytes_per_video'] - report['trimmed_bytes_per_video']:,} bytes")
+        if not args.online:
+            print("The replay times leave out the network, --online N times real extractions")
+    else:
+        for name, seconds in benchmark(urls, args.fixture, args.latency, args.workers).items():
+            print(f"{name:>7}: {seconds:.2f}s")